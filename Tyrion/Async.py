@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+基于asyncio的异步验证（仅支持Python3），用于 "用户名是否已存在"、"优惠券是否有效" 等需要I/O的验证
+
+如：
+    async def username_not_taken(value):
+        if await db.exists('user', username=value):
+            return '用户名已存在'
+
+    class RegisterForm(Form):
+        username = StringField(async_validators=[AsyncValidator(username_not_taken, timeout=0.5)])
+
+    form = RegisterForm(handler)
+    if await form.is_valid_async():
+        pass
+"""
+import asyncio
+
+
+class AsyncValidator(object):
+    def __init__(self, func, timeout=None, timeout_error=None):
+        """
+        :param func: 异步验证函数，参数为字段验证通过后的值；验证失败时返回错误信息，验证成功时返回None；
+                     抛出的异常（如数据库连接失败）不会被视为验证失败，而是由 is_valid_async 原样抛出
+        :param timeout: 超时时间（秒），超时视为验证失败
+        :param timeout_error: 超时时的错误信息，默认使用字段自定义错误信息中的timeout
+        :return:
+        """
+        self.func = func
+        self.timeout = timeout
+        self.timeout_error = timeout_error
+
+    async def __call__(self, field, value):
+        """
+        执行验证
+        :param field: 字段
+        :param value: 字段验证通过后的值
+        :return: 错误信息，验证成功时返回None
+        """
+        try:
+            return await asyncio.wait_for(self.func(value), self.timeout)
+        except asyncio.TimeoutError:
+            if self.timeout_error:
+                return self.timeout_error
+            return field.get_error('timeout', "%s validation timed out" % field.name)
+
+
+def _is_empty(value):
+    return value is None or value == '' or value == []
+
+
+async def is_valid_async(form, fail_fast=True):
+    """
+    先执行所有字段的同步验证，再并发执行同步验证通过的字段中声明的异步验证函数
+    :param form: Form对象
+    :param fail_fast: 为True时，任意字段验证失败后立即取消尚未完成的异步验证
+    :return:
+    异步验证函数抛出异常时，先取消并等待其余尚未完成的异步验证，再将该异常原样抛出，
+    此时表单保持同步验证后的状态（不写入任何异步验证的错误信息），由调用方决定返回500或重试
+    """
+    if not form.is_valid(fail_fast) and fail_fast:
+        return False
+
+    tasks = {}
+    for k, bound_field in form.FiledDict.items():
+        if not bound_field.status or _is_empty(bound_field.value):
+            continue
+        for index, validator in enumerate(bound_field.field.async_validators):
+            if not isinstance(validator, AsyncValidator):
+                validator = AsyncValidator(validator)
+            task = asyncio.ensure_future(validator(bound_field.field, bound_field.value))
+            tasks[task] = (k, index)
+
+    # 同一字段的多个异步验证函数失败时，使用声明顺序靠前的错误信息
+    errors = {}
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                error = task.result()
+                if error:
+                    k, index = tasks[task]
+                    if k not in errors or index < errors[k][0]:
+                        errors[k] = (index, error)
+            if errors and fail_fast:
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)
+
+    for k, (index, error) in errors.items():
+        bound_field = form.FiledDict[k]
+        bound_field.status = False
+        bound_field.error = error
+        form.value_dict.pop(k, None)
+        form.error_dict[k] = error
+        form.valid_status = False
+
+    return form.valid_status
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+生成的HTML片段的LRU缓存（默认关闭），开启后未变化的字段直接从内存中返回HTML
+
+如：
+    from Tyrion import Cache
+    Cache.fragment_cache.resize(1024)
+    Cache.fragment_cache.stats()        # {'hits': 10, 'misses': 2, 'size': 2, 'maxsize': 1024}
+PS:
+    插件的属性和选项通过赋值修改时缓存自动失效；原地修改选项列表（如：text_value_list.append）后需要调用 widget.touch()
+
+Form的验证结果缓存见 Form.RESULT_CACHE_SIZE（ResultCache）
+"""
+import collections
+import hashlib
+import threading
+from timeit import default_timer
+
+from Tyrion.Choices import choices_version
+from Tyrion.Compat import text_type
+
+
+class LRUCache(object):
+    def __init__(self, maxsize=128):
+        """
+        :param maxsize: 最多缓存的条目数，为0时不缓存
+        :return:
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data[key] = value
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def invalidate(self, predicate):
+        """
+        删除满足条件的缓存
+        :param predicate: 参数为缓存的键，返回值为真时删除
+        :return: 删除的条目数
+        """
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def resize(self, maxsize):
+        """
+        修改缓存大小，超出部分按最近最少使用的顺序删除
+        :param maxsize: 最多缓存的条目数，为0时关闭缓存
+        :return:
+        """
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data), 'maxsize': self.maxsize}
+
+    def __len__(self):
+        return len(self._data)
+
+
+def value_key(value):
+    """
+    值的缓存键
+    :param value: 显示的值 或 选中的值
+    :return:
+    """
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return value.__class__, tuple([(item.__class__, text_type(item)) for item in value])
+    return value.__class__, text_type(value)
+
+
+class FragmentCache(LRUCache):
+    """
+    插件生成的HTML片段缓存，键为 (插件类, 属性字符串, 插件版本, 选项版本, 值)
+    """
+
+    def render(self, widget, value):
+        """
+        生成HTML标签，优先从缓存中获取
+        :param widget: 插件
+        :param value: 显示的值 或 选中的值
+        :return:
+        """
+        key = (widget.__class__, widget.attr.html(), widget.version,
+               choices_version(getattr(widget, 'text_value_list', None)), value_key(value))
+        html = self.get(key)
+        if html is None:
+            html = widget.render(value)
+            self.set(key, html)
+        return html
+
+    def invalidate_widget(self, widget):
+        """
+        删除某个插件的所有缓存
+        :param widget: 插件
+        :return: 删除的条目数
+        """
+        return self.invalidate(lambda key: key[2] == widget.version)
+
+
+class ResultCache(LRUCache):
+    """
+    Form的验证结果缓存，键为参数快照的哈希值，条目超过ttl秒后失效
+    """
+    timer = staticmethod(default_timer)
+
+    def __init__(self, maxsize=1024, ttl=None):
+        """
+        :param maxsize: 最多缓存的条目数
+        :param ttl: 有效期（秒），为None时不过期
+        :return:
+        """
+        super(ResultCache, self).__init__(maxsize)
+        self.ttl = ttl
+
+    @staticmethod
+    def snapshot_key(snapshot, fields):
+        """
+        参数快照的哈希值，只包括参与缓存的字段
+        :param snapshot: 参数快照
+        :param fields: 字段名称和是否为多值字段，如：(('username', False), ('hobby', True))
+        :return:
+        """
+        items = [(k, tuple(snapshot.getlist(k, [])) if multiple else snapshot.get(k)) for k, multiple in fields]
+        return hashlib.sha1(repr(items).encode('utf-8')).digest()
+
+    def get(self, key, default=None):
+        entry = super(ResultCache, self).get(key)
+        if entry is None:
+            return default
+        expires, result = entry
+        if expires is not None and self.timer() > expires:
+            with self._lock:
+                if self._data.get(key) is entry:
+                    del self._data[key]
+                self.hits -= 1
+                self.misses += 1
+            return default
+        return result
+
+    def set(self, key, value):
+        expires = self.timer() + self.ttl if self.ttl is not None else None
+        super(ResultCache, self).set(key, (expires, value))
+
+
+fragment_cache = FragmentCache(maxsize=0)
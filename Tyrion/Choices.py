@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+选项提供者：select、radio、checkbox插件的选项可以来自数据库等外部数据源，被所有请求共享
+
+如：
+    def load_categories():
+        return [(row.id, row.name) for row in db.query(Category)]
+
+    categories = ChoiceProvider(load_categories, ttl=60)
+
+    class ArticleForm(Form):
+        category = IntegerField(widget=Widget.SingleSelect(text_value_list=categories))
+"""
+import threading
+import time
+
+from Tyrion.Compat import text_type
+
+
+def selection_key(value):
+    """
+    选中值的比较键，使请求中的'3'与选项中的3视为相等；值为整数的浮点数与整数视为相等，
+    如：FloatField验证后的1.0与选项中的1
+    :param value: 选项的值 或 选中的值
+    :return:
+    """
+    if isinstance(value, text_type):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return text_type(int(value))
+    return text_type(value)
+
+
+def selection_index(values):
+    """
+    生成选中值的哈希索引，判断选项是否选中的时间复杂度为O(1)
+    :param values: 选中的值列表，如：[2, '3']
+    :return:
+    """
+    if values is None:
+        return frozenset()
+    if not isinstance(values, (list, tuple, set, frozenset)):
+        values = [values]
+    return frozenset([selection_key(value) for value in values])
+
+
+class ChoiceProvider(object):
+    """
+    共享的选项提供者，第一次使用时加载，按TTL或数据源版本刷新
+    选项以三个平行的元组保存：values、texts、keys（values的比较键），不为每个选项创建字典
+    PS:
+        Form类创建时会深拷贝字段和插件，ChoiceProvider不会被拷贝，所有Form类和请求共享同一份选项
+    """
+
+    def __init__(self, loader=None, ttl=None, source_version=None, choices=None, version_interval=1):
+        """
+        :param loader: 加载选项的函数，返回值如：[{'value': 1, 'text': '篮球'}, ...] 或 [(1, '篮球'), ...]
+        :param ttl: 选项的有效时间（秒），过期后重新加载；同时指定source_version时，过期后先检查数据源版本
+        :param source_version: 获取数据源版本的函数，如：返回数据表的最后修改时间，版本变化时重新加载
+        :param choices: 固定的选项（不需要loader时使用）
+        :param version_interval: 只指定source_version、未指定ttl时，两次检查数据源版本的最小间隔（秒），
+                                 避免每次渲染、验证都在锁内调用source_version；为0时每次使用都检查
+        :return:
+        """
+        self.loader = loader
+        self.ttl = ttl
+        self.source_version = source_version
+        self.version_interval = version_interval
+        self.version = 0
+
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self._current_source_version = None
+        # (values, texts, keys, key_index)，刷新时整体替换，其他线程不会读取到新旧混合的选项
+        self._columns = ((), (), (), frozenset())
+        if choices is not None:
+            self.set_choices(choices)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def set_choices(self, choices):
+        """
+        设置选项并更新版本号
+        :param choices: 选项，如：[{'value': 1, 'text': '篮球'}, ...] 或 [(1, '篮球'), ...]
+        :return:
+        """
+        values = []
+        texts = []
+        for item in choices:
+            if isinstance(item, dict):
+                values.append(item['value'])
+                texts.append(item['text'])
+            else:
+                values.append(item[0])
+                texts.append(item[1])
+        keys = tuple([selection_key(value) for value in values])
+        self._columns = (tuple(values), tuple(texts), keys, frozenset(keys))
+        self._loaded_at = time.time()
+        self.version += 1
+
+    def _expired(self):
+        if self._loaded_at is None:
+            return self.loader is not None
+        if self.loader is None:
+            return False
+        if self.ttl is not None:
+            return time.time() - self._loaded_at >= self.ttl
+        if self.source_version is None:
+            return False
+        return time.time() - self._loaded_at >= self.version_interval
+
+    def ensure_loaded(self):
+        """
+        第一次使用或过期时加载选项
+        :return:
+        """
+        if not self._expired():
+            return
+        with self._lock:
+            if not self._expired():
+                return
+            if self._loaded_at is not None and self.source_version is not None:
+                current = self.source_version()
+                if current == self._current_source_version:
+                    self._loaded_at = time.time()
+                    return
+                self._current_source_version = current
+            elif self.source_version is not None:
+                self._current_source_version = self.source_version()
+            self.set_choices(self.loader())
+
+    def refresh(self):
+        """
+        立即重新加载选项
+        :return:
+        """
+        with self._lock:
+            if self.source_version is not None:
+                self._current_source_version = self.source_version()
+            self.set_choices(self.loader())
+
+    def invalidate(self):
+        """
+        使选项过期，下次使用时重新加载
+        :return:
+        """
+        self._loaded_at = None
+
+    def columns(self):
+        """
+        :return: (values, texts, keys)
+        """
+        self.ensure_loaded()
+        values, texts, keys, _ = self._columns
+        return values, texts, keys
+
+    def key_index(self):
+        """
+        选项的哈希索引，每次加载选项时生成一次
+        :return: 选项比较键的frozenset
+        """
+        self.ensure_loaded()
+        return self._columns[3]
+
+    def __iter__(self):
+        # 兼容以字典列表表示的选项
+        values, texts, keys = self.columns()
+        for value, text in zip(values, texts):
+            yield {'value': value, 'text': text}
+
+    def __len__(self):
+        return len(self.columns()[0])
+
+
+def choice_columns(choices):
+    """
+    将选项转换为三个平行的序列
+    :param choices: ChoiceProvider对象 或 字典列表，如：[{'value': 1, 'text': '篮球'}, ...]
+    :return: (values, texts, keys)
+    """
+    if isinstance(choices, ChoiceProvider):
+        return choices.columns()
+    values = [item['value'] for item in choices]
+    texts = [item['text'] for item in choices]
+    return values, texts, [selection_key(value) for value in values]
+
+
+def choices_version(choices):
+    """
+    选项的版本号，用于HTML片段缓存
+    :param choices: ChoiceProvider对象 或 字典列表
+    :return:
+    """
+    if isinstance(choices, ChoiceProvider):
+        choices.ensure_loaded()
+        return choices.version
+    return None
@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+
+def with_metaclass(meta, *bases):
+    """
+    同时兼容Python2和Python3的元类声明方式，如：
+        class Form(with_metaclass(FormMeta, object)):
+            pass
+    :param meta: 元类
+    :param bases: 基类
+    :return:
+    """
+
+    class MetaClass(meta):
+        def __new__(mcs, name, this_bases, attrs):
+            return meta(name, bases, attrs)
+
+    return type.__new__(MetaClass, 'TemporaryClass', (), {})
+
+
+try:
+    text_type = unicode
+    string_types = (str, unicode)
+except NameError:
+    text_type = str
+    string_types = (str,)
+
+try:
+    integer_types = (int, long)
+except NameError:
+    integer_types = (int,)
@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+将Form类的验证过程编译为一个Python函数：内联每个字段的参数读取、验证规则和预先格式化的错误信息，
+避免Field.check的动态调用、custom_error_dict的查找和错误信息的格式化（类似dataclasses生成__init__）
+
+如：
+    class LoginForm(Form):
+        COMPILE = True
+        username = StringField(max_length=32)
+
+    print(LoginForm.compiled_source)    # 查看生成的代码
+PS:
+    DEBUG为True（或环境变量TYRION_DEBUG=1）时所有Form都使用解释执行的验证过程，便于调试
+    编译发生在Form类创建时，之后修改字段的配置（如：max_length、custom_error_dict）不会生效
+"""
+import linecache
+import os
+
+from Tyrion import Fields
+
+DEBUG = os.environ.get('TYRION_DEBUG') == '1'
+
+_compiled_count = [0]
+
+
+class FormCompiler(object):
+    def __init__(self, form_class):
+        self.form_class = form_class
+        self.namespace = {}
+        self.lines = []
+
+    def constant(self, prefix, value):
+        """
+        将常量放入生成函数的命名空间，返回其变量名
+        """
+        name = '%s_%s' % (prefix, len(self.namespace))
+        self.namespace[name] = value
+        return name
+
+    def emit(self, indent, line):
+        self.lines.append('    ' * indent + line if line else line)
+
+    def error(self, field, key, default):
+        return self.constant('ERROR', field.get_error(key, default))
+
+    def compile(self):
+        """
+        生成验证函数
+        :return: (函数, 源代码)
+        """
+        self.emit(1, 'fields = form.FiledDict')
+        self.emit(1, 'value_dict = form.value_dict')
+        self.emit(1, 'error_dict = form.error_dict')
+        self.emit(1, 'get = snapshot.get')
+        self.emit(1, 'getlist = snapshot.getlist')
+        for name, field in self.form_class.base_fields:
+            self.compile_field(name, field)
+        self.emit(1, 'return form.valid_status')
+
+        _compiled_count[0] += 1
+        func_name = 'is_valid_%s' % self.form_class.__name__
+        source = 'def %s(form, snapshot, fail_fast):\n%s\n' % (func_name, '\n'.join(self.lines))
+        filename = '<Tyrion compiled %s #%s>' % (self.form_class.__name__, _compiled_count[0])
+        # 使异常堆栈中可以显示生成的代码
+        linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+        exec(compile(source, filename, 'exec'), self.namespace)
+        return self.namespace[func_name], source
+
+    def compile_field(self, name, field):
+        key = repr(name)
+        self.emit(1, '')
+        self.emit(1, '# %s: %s' % (name, field.__class__.__name__))
+        self.emit(1, 'bound = fields[%s]' % key)
+        if field.MULTIPLE:
+            self.emit(1, 'input_value = getlist(%s, [])' % key)
+        else:
+            self.emit(1, 'input_value = get(%s)' % key)
+
+        generator = inline_generator(field)
+        if generator is None or not generator(self, field):
+            # 自定义字段，调用字段的check方法
+            self.emit(1, 'status, value, error = %s(input_value)' % self.constant('check', field.check))
+
+        self.emit(1, 'bound.status, bound.value, bound.error = status, value, error')
+        self.emit(1, 'if status:')
+        self.emit(2, 'value_dict[%s] = value' % key)
+        self.emit(1, 'else:')
+        self.emit(2, 'error_dict[%s] = error' % key)
+        self.emit(2, 'form.valid_status = False')
+        self.emit(2, 'if fail_fast:')
+        self.emit(3, 'return False')
+
+    def emit_required(self, field):
+        self.emit(1, 'value = input_value')
+        self.emit(1, 'status, error = True, None')
+        self.emit(1, 'if not input_value:')
+        if field.required:
+            self.emit(2, 'status, error = False, %s' % self.error(field, 'required', "%s is required" % field.name))
+        else:
+            self.emit(2, 'pass')
+
+    def emit_choices(self, indent, field):
+        if field.choices_only:
+            self.emit(indent, 'status, value, error = %s(value)' % self.constant('check_choices', field.check_choices))
+
+    def emit_length(self, field, keyword, value_name, min_limit):
+        """
+        生成长度验证的elif分支
+        :param min_limit: 最小长度比较的对象（EmailField、IPField中为max_length）
+        """
+        if field.max_length:
+            self.emit(1, '%s len(%s) > %r:' % (keyword, value_name, field.max_length))
+            self.emit(2, 'status, error = False, %s' % self.error(
+                field, 'max_length', "%s max length is %s" % (field.name, field.max_length)))
+            keyword = 'elif'
+        if field.min_length:
+            self.emit(1, '%s len(%s) < %r:' % (keyword, value_name, min_limit))
+            self.emit(2, 'status, error = False, %s' % self.error(
+                field, 'min_length', "%s min length is %s" % (field.name, field.min_length)))
+
+    def inline_string(self, field):
+        min_limit = field.min_length
+        if not isinstance(field, Fields.StringField):
+            # EmailField、IPField中最小长度与max_length比较（与解释执行保持一致）
+            min_limit = field.max_length
+            if field.min_length and min_limit is None:
+                return False
+
+        matcher = self.constant('matcher', field.matcher)
+        self.emit_required(field)
+        if field.cheap_first:
+            self.emit_length(field, 'elif', 'input_value', min_limit)
+        self.emit(1, 'elif not %s(input_value):' % matcher)
+        self.emit(2, 'status, error = False, %s' % self.error(field, 'invalid', "%s is invalid" % field.name))
+        if not field.cheap_first:
+            self.emit_length(field, 'elif', 'input_value', min_limit)
+        if field.choices_only:
+            self.emit(1, 'else:')
+            self.emit_choices(2, field)
+        return True
+
+    def inline_number(self, field, convert):
+        matcher = self.constant('matcher', field.matcher)
+        self.emit_required(field)
+        self.emit(1, 'elif not %s(input_value):' % matcher)
+        self.emit(2, 'status, error = False, %s' % self.error(field, 'invalid', "%s is invalid" % field.name))
+        self.emit(1, 'else:')
+        self.emit(2, 'value = %s(input_value)' % convert)
+        keyword = 'if'
+        if field.max_value:
+            self.emit(2, '%s value > %r:' % (keyword, field.max_value))
+            self.emit(3, 'status, error = False, %s' % self.error(
+                field, 'max_value', "%s max value is %s" % (field.name, field.max_value)))
+            keyword = 'elif'
+        if field.min_value:
+            self.emit(2, '%s value < %r:' % (keyword, field.min_value))
+            self.emit(3, 'status, error = False, %s' % self.error(
+                field, 'min_value', "%s min value is %s" % (field.name, field.min_value)))
+            keyword = 'elif'
+        if field.choices_only:
+            if keyword == 'if':
+                self.emit_choices(2, field)
+            else:
+                self.emit(2, 'else:')
+                self.emit_choices(3, field)
+        return True
+
+    def inline_integer(self, field):
+        return self.inline_number(field, 'int')
+
+    def inline_float(self, field):
+        return self.inline_number(field, 'float')
+
+    def emit_element_length(self, field):
+        if field.ele_max_length:
+            self.emit(3, 'if len(element) > %r:' % field.ele_max_length)
+            self.emit(4, 'status, error = False, %s' % self.error(
+                field, 'ele_max_length', "element %s max length is %s" % (field.name, field.ele_max_length)))
+            self.emit(4, 'break')
+        if field.ele_min_length:
+            self.emit(3, 'if len(element) < %r:' % field.ele_min_length)
+            self.emit(4, 'status, error = False, %s' % self.error(
+                field, 'ele_min_length', "element %s min length is %s" % (field.name, field.ele_min_length)))
+            self.emit(4, 'break')
+
+    def inline_string_list(self, field):
+        matcher = self.constant('matcher', field.matcher)
+        self.emit_required(field)
+        self.emit(1, 'else:')
+        self.emit(2, 'for element in input_value:')
+        if field.cheap_first:
+            self.emit_element_length(field)
+        self.emit(3, 'if not %s(element):' % matcher)
+        self.emit(4, 'status, error = False, %s' % self.error(field, 'element', "element %s is invalid" % field.name))
+        self.emit(4, 'break')
+        if not field.cheap_first:
+            self.emit_element_length(field)
+        if field.choices_only:
+            self.emit(2, 'else:')
+            self.emit_choices(3, field)
+        return True
+
+    def inline_integer_list(self, field):
+        matcher = self.constant('matcher', field.matcher)
+        self.emit_required(field)
+        self.emit(1, 'else:')
+        self.emit(2, 'success_value_list = []')
+        self.emit(2, 'for element in input_value:')
+        self.emit(3, 'if not %s(element):' % matcher)
+        self.emit(4, 'status, error = False, %s' % self.error(field, 'element', "element %s is invalid" % field.name))
+        self.emit(4, 'break')
+        self.emit(3, 'element = int(element)')
+        self.emit(3, 'success_value_list.append(element)')
+        if field.ele_max_value:
+            self.emit(3, 'if element > %r:' % field.ele_max_value)
+            self.emit(4, 'status, error = False, %s' % self.error(
+                field, 'ele_max_value', "element %s max value is %s" % (field.name, field.ele_max_value)))
+            self.emit(4, 'break')
+        if field.ele_min_value:
+            self.emit(3, 'if element < %r:' % field.ele_min_value)
+            self.emit(4, 'status, error = False, %s' % self.error(
+                field, 'ele_min_value', "element %s min value is %s" % (field.name, field.ele_min_value)))
+            self.emit(4, 'break')
+        self.emit(2, 'else:')
+        self.emit(3, 'value = success_value_list')
+        self.emit_choices(3, field)
+        return True
+
+
+# 可以内联验证过程的内置字段类
+INLINE_CHECKS = {
+    Fields.StringField: FormCompiler.inline_string,
+    Fields.EmailField: FormCompiler.inline_string,
+    Fields.IPField: FormCompiler.inline_string,
+    Fields.IntegerField: FormCompiler.inline_integer,
+    Fields.FloatField: FormCompiler.inline_float,
+    Fields.StringListField: FormCompiler.inline_string_list,
+    Fields.IntegerListField: FormCompiler.inline_integer_list,
+}
+
+# 内联代码中展开的方法，字段类或字段对象重写其中任意一个时不能内联
+INLINE_METHODS = ('check', 'check_value', 'check_length', 'check_choices')
+
+
+def inline_generator(field):
+    """
+    获取字段的内联代码生成方法
+    :param field: 字段对象
+    :return: 生成方法；字段类（或字段对象）重写了验证方法、REGULAR时返回None，调用字段自身的check
+    """
+    base = None
+    for cls in field.__class__.__mro__:
+        if cls in INLINE_CHECKS:
+            base = cls
+            break
+    if base is None:
+        return None
+    for name in INLINE_METHODS:
+        # 比较定义方法的类，而不是方法对象（Python2中每次访问未绑定方法都会创建新对象）
+        if name in field.__dict__ or Fields.defined_in(field.__class__, name) is not Fields.defined_in(base, name):
+            return None
+    if 'matcher' in field.__dict__ or field.REGULAR != base.REGULAR:
+        return None
+    return INLINE_CHECKS[base]
+
+
+def compile_form(form_class):
+    """
+    将Form类的验证过程编译为一个函数
+    :param form_class: Form的派生类
+    :return: (函数, 源代码)，函数的参数为 (form, snapshot, fail_fast)
+    """
+    return FormCompiler(form_class).compile()
@@ -1,50 +1,240 @@
 #!/usr/bin/env python
 # -*- coding:utf-8 -*-
-import re
+import copy
 from Tyrion import Widget
+from Tyrion import Cache
+from Tyrion import Metrics
+from Tyrion import Tracing
+from Tyrion.Choices import ChoiceProvider
+from Tyrion.Choices import choice_columns
+from Tyrion.Choices import selection_key
+from Tyrion import Validators
+from Tyrion.Compat import integer_types
+from Tyrion.Compat import with_metaclass
 from Tyrion.Framework import FrameworkFactory
+from Tyrion.Framework import json_text
 
 
-class Field(object):
+def is_natural(value):
     """
-    所有Form字段的基类
+    是否为JSON中的非负整数（不包括True、False），此类值一定能通过 ^\\d+$ 的验证
+    """
+    return isinstance(value, integer_types) and not isinstance(value, bool) and value >= 0
+
+
+def defined_in(cls, name):
+    """
+    沿MRO查找定义了某个属性的类（比较方法本身，Python2中每次访问未绑定方法都会创建新对象）
+    :param cls: 类
+    :param name: 属性名称，如：check
+    :return: 定义该属性的类，未定义时返回None
     """
+    for klass in cls.__mro__:
+        if name in klass.__dict__:
+            return klass
+    return None
+
 
-    def __init__(self, widget):
+class FieldMeta(type):
+    """
+    Field的元类，在类创建时将REGULAR编译为验证函数matcher，避免每次验证都查找re模块的缓存
+    """
+
+    def __new__(mcs, name, bases, attrs):
+        cls = super(FieldMeta, mcs).__new__(mcs, name, bases, attrs)
+        regular = getattr(cls, 'REGULAR', None)
+        if regular is not None:
+            cls.matcher = staticmethod(Validators.compile_rule(regular))
+        # 按旧的扩展方式只重写了valid(handler)（在valid中设置status、value、error）而没有重写check的自定义字段
+        valid_class, check_class = defined_in(cls, 'valid'), defined_in(cls, 'check')
+        cls.legacy_valid = valid_class is not check_class and issubclass(valid_class, check_class)
+        # 自定义字段重写了get_input时，Form使用该方法从请求对象中获取输入，而不是从参数快照中获取
+        input_class = defined_in(cls, 'get_input')
+        cls.custom_input = input_class is not None and input_class.__module__ != __name__
+        return cls
+
+
+class Field(with_metaclass(FieldMeta, object)):
+    """
+    所有Form字段的基类
+    """
+    # 字段的声明顺序，Form据此对字段排序
+    creation_counter = 0
+    # 是否为多值字段（用户输入的值为列表）
+    MULTIPLE = False
+    # 是否先执行长度等开销较小的验证，再执行正则验证（由Form.CHEAP_FIRST设置）
+    cheap_first = False
+    # 字段所属Form类的名称（由FormMeta设置），用于统计指标
+    form_name = None
+    # 验证结果是否可以被Form的验证结果缓存复用，验证结果不确定的字段（如：依赖数据库或当前时间）应设置为False
+    cacheable = True
+
+    def __init__(self, widget, async_validators=None, source=None, choices_only=False):
         self.status = False
         self.name = None
         self.value = None
         self.error = None
         self.widget = widget
+        self.async_validators = async_validators if async_validators else []
+        self.source = source
+        self.choices_only = choices_only
+        self._choice_index = None
+        if choices_only and not hasattr(widget, 'text_value_list'):
+            raise Exception('字段参数choices_only为True时，插件必须有选项（text_value_list），当前插件为：%s' % widget.__class__)
+
+        self.creation_counter = Field.creation_counter
+        Field.creation_counter += 1
 
-    def valid(self, handler):
+    def get_input(self, handler, framework=None):
         """
-        字段必须实现该方法，用于从请求中获取用户输入的值并和规则进行比较
+        从请求中获取用户输入的值（多值字段需重写为get_arguments）
+        PS:
+            自定义字段重写该方法后（如：将输入转换为小写），Form验证该字段时不使用参数快照，每次调用该方法获取输入
         :param handler: Tornado处理请求的XXXHandler对象
+        :param framework: Web框架适配器对象，默认为当前上下文中的Web框架
         :return:
         """
-        raise NotImplementedError('your class %s must implement valid method' % self.__class__)
+        if framework is None:
+            framework = FrameworkFactory.get_framework()
+        return framework.get_argument(handler, self.name, None)
 
-    def __str__(self):
+    def check(self, input_value):
+        """
+        字段必须实现该方法，用于将用户输入的值和规则进行比较；该方法不能修改字段自身，以便同一字段被多个请求共享
+        PS:
+            兼容只重写了valid(handler)的自定义字段（旧的扩展方式），此类字段每次验证时在复制的字段上调用valid，
+            不能使用参数快照、编译和验证结果缓存，也不支持validate_many等没有请求对象的批量验证
+        :param input_value: 用户输入的值
+        :return: (status, value, error)
+        """
+        raise NotImplementedError('your class %s must implement check method' % self.__class__)
 
-        if self.value == None:
+    def check_json(self, input_value):
+        """
+        将JSON中的值（原生类型，如：int、float、list）和规则进行比较，默认转换为字符串后使用check验证，
+        字段可以重写该方法，在值的类型已经能证明格式正确时跳过正则验证
+        :param input_value: JSON中的值
+        :return: (status, value, error)
+        """
+        if self.MULTIPLE:
+            if input_value is None:
+                input_value = []
+            elif not isinstance(input_value, list):
+                input_value = [input_value]
+            return self.check([json_text(element) for element in input_value])
+        if isinstance(input_value, (list, dict)):
+            return False, input_value, self.get_error('invalid', "%s is invalid" % self.name)
+        return self.check(json_text(input_value))
+
+    def get_choice_index(self):
+        """
+        获取插件中选项的哈希索引，选项或插件变化时重新生成，否则所有请求共享同一索引
+        :return:
+        """
+        choices = self.widget.text_value_list
+        if isinstance(choices, ChoiceProvider):
+            return choices.key_index()
+        cache = self._choice_index
+        if cache is None or cache[0] != self.widget.version:
+            cache = (self.widget.version, frozenset(choice_columns(choices)[2]))
+            self._choice_index = cache
+        return cache[1]
+
+    def check_choices(self, value):
+        """
+        验证通过后的值是否为插件中的选项之一（choices_only为True时）
+        :param value: 验证通过后的值
+        :return: (status, value, error)
+        """
+        if not self.choices_only:
+            return True, value, None
+        index = self.get_choice_index()
+        if self.MULTIPLE:
+            for element in value:
+                if selection_key(element) not in index:
+                    return False, value, self.get_error('choice', "element %s is not a valid choice" % self.name)
+        elif selection_key(value) not in index:
+            return False, value, self.get_error('choice', "%s is not a valid choice" % self.name)
+        return True, value, None
+
+    def get_error(self, key, default):
+        """
+        获取错误信息，优先使用自定义错误信息
+        :param key: 错误类型，如：required、invalid
+        :param default: 默认错误信息
+        :return:
+        """
+        return self.custom_error_dict.get(key, None) or default
+
+    def valid(self, handler, framework=None):
+        """
+        从请求中获取用户输入的值并和规则进行比较
+        :param handler: Tornado处理请求的XXXHandler对象
+        :param framework: Web框架适配器对象，默认为当前上下文中的Web框架
+        :return:
+        """
+        # 兼容重写了get_input(handler)的自定义字段
+        input_value = self.get_input(handler) if framework is None else self.get_input(handler, framework)
+        registry = Metrics.registry
+        if not registry.enabled:
+            self.status, self.value, self.error = self.check(input_value)
+            return
+        start = registry.timer()
+        self.status, self.value, self.error = self.check(input_value)
+        registry.observe_field(self, registry.timer() - start, self.error)
+
+    def render(self, value):
+        """
+        根据值生成HTML标签，不修改字段中的插件（插件可能被多个请求共享）
+        :param value: 显示的值 或 选中的值
+        :return:
+        """
+        registry = Metrics.registry
+        tracer = Tracing.tracer
+        if not registry.enabled and not tracer.hooks:
+            return self._render(value)
+        trace = tracer.start_render(self, value) if tracer.hooks else None
+        start = registry.timer()
+        html = self._render(value)
+        if registry.enabled:
+            registry.observe_render(self, registry.timer() - start)
+        if trace is not None:
+            tracer.finish(trace)
+        return html
+
+    def _render(self, value):
+        if isinstance(self.widget, Widget.BaseWidget):
+            if Cache.fragment_cache.maxsize:
+                return Cache.fragment_cache.render(self.widget, value)
+            return self.widget.render(value)
+        if value == None:
             return str(self.widget)
 
-        if isinstance(self.widget, Widget.SingleSelect):
-            self.widget.selected_value = self.value
-        elif isinstance(self.widget, Widget.MultiSelect):
-            self.widget.selected_value_list = self.value
-        elif isinstance(self.widget, Widget.InputSingleCheckBox):
-            self.widget.attr['checked'] = 'checked'
-        elif isinstance(self.widget, Widget.InputMultiCheckBox):
-            self.widget.checked_value_list = self.value
-        elif isinstance(self.widget, Widget.InputRadio):
-            self.widget.checked_value = self.value
-        elif isinstance(self.widget, Widget.TextArea):
-            self.widget.value = self.value
+        # 未继承BaseWidget的自定义插件
+        widget = copy.copy(self.widget)
+        widget.attr = dict(widget.attr, value=value)
+        return str(widget)
+
+    def iter_render(self, value):
+        """
+        根据值分块生成HTML标签（生成器）
+        :param value: 显示的值 或 选中的值
+        :return:
+        """
+        if isinstance(self.widget, Widget.BaseWidget):
+            chunks = self.widget.iter_render(value)
         else:
-            self.widget.attr['value'] = self.value
-        return str(self.widget)
+            chunks = iter([self._render(value)])
+        if Metrics.registry.enabled:
+            chunks = Metrics.registry.iter_render(self, chunks)
+        if Tracing.tracer.hooks:
+            trace = Tracing.tracer.start_render(self, value)
+            if trace is not None:
+                chunks = Tracing.tracer.iter_render(trace, chunks)
+        return chunks
+
+    def __str__(self):
+        return self.render(self.value)
 
     def set_value(self, value):
         self.value = value
@@ -57,7 +247,8 @@ class StringField(Field):
     REGULAR = "^.*$"
     DEFAULT_WIDGET = Widget.InputText
 
-    def __init__(self, max_length=None, min_length=None, error=None, required=True, widget=None):
+    def __init__(self, max_length=None, min_length=None, error=None, required=True, widget=None, async_validators=None,
+                 source=None, choices_only=False):
         """
         :param error: 自定义错误信息
                       如：{
@@ -68,6 +259,9 @@ class StringField(Field):
                          }
         :param required: 是否必须
         :param widget: 指定插件，用于生成HTML标签（默认生成Input标签）
+        :param async_validators: 异步验证函数列表，仅在 Form.is_valid_async 中执行，详见 Async.AsyncValidator
+        :param source: 参数来源，query表示只从GET参数中获取，body表示只从POST等参数中获取，None表示两者
+        :param choices_only: 用户输入的值必须是插件中的选项之一（插件必须有text_value_list，如：SingleSelect）
         :return:
         """
         self.custom_error_dict = {}
@@ -80,56 +274,53 @@ class StringField(Field):
 
         widget = widget if widget else self.DEFAULT_WIDGET()
 
-        super(StringField, self).__init__(widget)
+        super(StringField, self).__init__(widget, async_validators, source, choices_only)
 
-    def valid(self, handler):
+    def check(self, input_value):
         """
-        从请求中获取用户输入的值并和规则进行比较
-        :param handler: Tornado处理请求的XXXHandler对象
-        :return:
+        将用户输入的值和规则进行比较
+        :param input_value: 用户输入的值
+        :return: (status, value, error)
         """
-        input_value = FrameworkFactory.get_framework().get_argument(handler, self.name, None)
-        # input_value = handler.get_argument(self.name, None)
-
-        self.value = input_value
+        value = input_value
 
         if not input_value:
             if not self.required:
-                self.status = True
-                return
+                return True, value, None
 
-            if self.custom_error_dict.get('required', None):
-                self.error = self.custom_error_dict['required']
-            else:
-                self.error = "%s is required" % self.name
-            return
+            return False, value, self.get_error('required', "%s is required" % self.name)
 
-        ret = re.match(self.REGULAR, input_value)
+        if self.cheap_first:
+            error = self.check_length(input_value)
+            if error:
+                return False, value, error
+
+        ret = self.matcher(input_value)
         if not ret:
-            if self.custom_error_dict.get('invalid', None):
-                self.error = self.custom_error_dict['invalid']
-            else:
-                self.error = "%s is invalid" % self.name
-            return
+            return False, value, self.get_error('invalid', "%s is invalid" % self.name)
+
+        if not self.cheap_first:
+            error = self.check_length(input_value)
+            if error:
+                return False, value, error
+
+        return self.check_choices(value)
 
+    def check_length(self, input_value):
+        """
+        验证用户输入的值的长度
+        :param input_value: 用户输入的值
+        :return: 错误信息，验证通过时返回None
+        """
         if self.max_length:
             if len(input_value) > self.max_length:
-                if self.custom_error_dict.get('max_length', None):
-                    self.error = self.custom_error_dict['max_length']
-                else:
-                    self.error = "%s max length is %s" % (self.name, self.max_length)
-                return
+                return self.get_error('max_length', "%s max length is %s" % (self.name, self.max_length))
 
         if self.min_length:
-
             if len(input_value) < self.min_length:
-                if self.custom_error_dict.get('min_length', None):
-                    self.error = self.custom_error_dict['min_length']
-                else:
-                    self.error = "%s min length is %s" % (self.name, self.min_length)
-                return
+                return self.get_error('min_length', "%s min length is %s" % (self.name, self.min_length))
 
-        self.status = True
+        return None
 
 
 class EmailField(Field):
@@ -139,7 +330,8 @@ class EmailField(Field):
     REGULAR = "^\w+([-+.']\w+)*@\w+([-.]\w+)*\.\w+([-.]\w+)*$"
     DEFAULT_WIDGET = Widget.InputText
 
-    def __init__(self, max_length=None, min_length=None, error=None, required=True, widget=None):
+    def __init__(self, max_length=None, min_length=None, error=None, required=True, widget=None, async_validators=None,
+                 source=None, choices_only=False):
         """
         :param error: 自定义错误信息
                       如：{
@@ -150,6 +342,9 @@ class EmailField(Field):
                          }
         :param required: 是否必须
         :param widget: 指定插件，用于生成HTML标签（默认生成Input标签）
+        :param async_validators: 异步验证函数列表，仅在 Form.is_valid_async 中执行，详见 Async.AsyncValidator
+        :param source: 参数来源，query表示只从GET参数中获取，body表示只从POST等参数中获取，None表示两者
+        :param choices_only: 用户输入的值必须是插件中的选项之一（插件必须有text_value_list，如：SingleSelect）
         :return:
         """
         self.custom_error_dict = {}
@@ -162,54 +357,51 @@ class EmailField(Field):
 
         widget = widget if widget else self.DEFAULT_WIDGET()
 
-        super(EmailField, self).__init__(widget)
+        super(EmailField, self).__init__(widget, async_validators, source, choices_only)
 
-    def valid(self, handler):
+    def check(self, input_value):
         """
-        从请求中获取用户输入的值并和规则进行比较
-        :param handler: Tornado处理请求的XXXHandler对象
-        :return:
+        将用户输入的值和规则进行比较
+        :param input_value: 用户输入的值
+        :return: (status, value, error)
         """
-
-        input_value = FrameworkFactory.get_framework().get_argument(handler, self.name, None)
-        # input_value = handler.get_argument(self.name, None)
-
-        self.value = input_value
+        value = input_value
         if not input_value:
             if not self.required:
-                self.status = True
-                return
-            if self.custom_error_dict.get('required', None):
-                self.error = self.custom_error_dict['required']
-            else:
-                self.error = "%s is required" % self.name
-            return
+                return True, value, None
+            return False, value, self.get_error('required', "%s is required" % self.name)
+
+        if self.cheap_first:
+            error = self.check_length(input_value)
+            if error:
+                return False, value, error
 
-        ret = re.match(self.REGULAR, input_value)
+        ret = self.matcher(input_value)
         if not ret:
-            if self.custom_error_dict.get('invalid', None):
-                self.error = self.custom_error_dict['invalid']
-            else:
-                self.error = "%s is invalid" % self.name
-            return
+            return False, value, self.get_error('invalid', "%s is invalid" % self.name)
+
+        if not self.cheap_first:
+            error = self.check_length(input_value)
+            if error:
+                return False, value, error
 
+        return self.check_choices(value)
+
+    def check_length(self, input_value):
+        """
+        验证用户输入的值的长度
+        :param input_value: 用户输入的值
+        :return: 错误信息，验证通过时返回None
+        """
         if self.max_length:
             if len(input_value) > self.max_length:
-                if self.custom_error_dict.get('max_length', None):
-                    self.error = self.custom_error_dict['max_length']
-                else:
-                    self.error = "%s max length is %s" % (self.name, self.max_length)
-                return
+                return self.get_error('max_length', "%s max length is %s" % (self.name, self.max_length))
 
         if self.min_length:
             if len(input_value) < self.max_length:
-                if self.custom_error_dict.get('min_length', None):
-                    self.error = self.custom_error_dict['min_length']
-                else:
-                    self.error = "%s min length is %s" % (self.name, self.min_length)
-                return
+                return self.get_error('min_length', "%s min length is %s" % (self.name, self.min_length))
 
-        self.status = True
+        return None
 
 
 class IPField(Field):
@@ -219,7 +411,8 @@ class IPField(Field):
     REGULAR = "^(25[0-5]|2[0-4]\d|[0-1]?\d?\d)(\.(25[0-5]|2[0-4]\d|[0-1]?\d?\d)){3}$"
     DEFAULT_WIDGET = Widget.InputText
 
-    def __init__(self, max_length=None, min_length=None, error=None, required=True, widget=None):
+    def __init__(self, max_length=None, min_length=None, error=None, required=True, widget=None, async_validators=None,
+                 source=None, choices_only=False):
         """
         :param error: 自定义错误信息
                       如：{
@@ -230,6 +423,9 @@ class IPField(Field):
                          }
         :param required: 是否必须
         :param widget: 指定插件，用于生成HTML标签（默认生成Input标签）
+        :param async_validators: 异步验证函数列表，仅在 Form.is_valid_async 中执行，详见 Async.AsyncValidator
+        :param source: 参数来源，query表示只从GET参数中获取，body表示只从POST等参数中获取，None表示两者
+        :param choices_only: 用户输入的值必须是插件中的选项之一（插件必须有text_value_list，如：SingleSelect）
         :return:
         """
         self.custom_error_dict = {}
@@ -242,54 +438,52 @@ class IPField(Field):
 
         widget = widget if widget else self.DEFAULT_WIDGET()
 
-        super(IPField, self).__init__(widget)
+        super(IPField, self).__init__(widget, async_validators, source, choices_only)
 
-    def valid(self, handler):
+    def check(self, input_value):
         """
-        从请求中获取用户输入的值并和规则进行比较
-        :param handler: Tornado处理请求的XXXHandler对象
-        :return:
+        将用户输入的值和规则进行比较
+        :param input_value: 用户输入的值
+        :return: (status, value, error)
         """
-        input_value = FrameworkFactory.get_framework().get_argument(handler, self.name, None)
-        # input_value = handler.get_argument(self.name, None)
-
-        self.value = input_value
+        value = input_value
         if not input_value:
             if not self.required:
-                self.status = True
-                return
+                return True, value, None
 
-            if self.custom_error_dict.get('required', None):
-                self.error = self.custom_error_dict['required']
-            else:
-                self.error = "%s is required" % self.name
-            return
+            return False, value, self.get_error('required', "%s is required" % self.name)
+
+        if self.cheap_first:
+            error = self.check_length(input_value)
+            if error:
+                return False, value, error
 
-        ret = re.match(self.REGULAR, input_value)
+        ret = self.matcher(input_value)
         if not ret:
-            if self.custom_error_dict.get('invalid', None):
-                self.error = self.custom_error_dict['invalid']
-            else:
-                self.error = "%s is invalid" % self.name
-            return
+            return False, value, self.get_error('invalid', "%s is invalid" % self.name)
+
+        if not self.cheap_first:
+            error = self.check_length(input_value)
+            if error:
+                return False, value, error
 
+        return self.check_choices(value)
+
+    def check_length(self, input_value):
+        """
+        验证用户输入的值的长度
+        :param input_value: 用户输入的值
+        :return: 错误信息，验证通过时返回None
+        """
         if self.max_length:
             if len(input_value) > self.max_length:
-                if self.custom_error_dict.get('max_length', None):
-                    self.error = self.custom_error_dict['max_length']
-                else:
-                    self.error = "%s max length is %s" % (self.name, self.max_length)
-                return
+                return self.get_error('max_length', "%s max length is %s" % (self.name, self.max_length))
 
         if self.min_length:
             if len(input_value) < self.max_length:
-                if self.custom_error_dict.get('min_length', None):
-                    self.error = self.custom_error_dict['min_length']
-                else:
-                    self.error = "%s min length is %s" % (self.name, self.min_length)
-                return
+                return self.get_error('min_length', "%s min length is %s" % (self.name, self.min_length))
 
-        self.status = True
+        return None
 
 
 class IntegerField(Field):
@@ -299,7 +493,8 @@ class IntegerField(Field):
     REGULAR = "^\d+$"
     DEFAULT_WIDGET = Widget.InputText
 
-    def __init__(self, max_value=None, min_value=None, error=None, required=True, widget=None):
+    def __init__(self, max_value=None, min_value=None, error=None, required=True, widget=None, async_validators=None,
+                 source=None, choices_only=False):
         """
         :param error: 自定义错误信息
                       如：{
@@ -310,6 +505,9 @@ class IntegerField(Field):
                          }
         :param required: 是否必须
         :param widget: 指定插件，用于生成HTML标签（默认生成Input标签）
+        :param async_validators: 异步验证函数列表，仅在 Form.is_valid_async 中执行，详见 Async.AsyncValidator
+        :param source: 参数来源，query表示只从GET参数中获取，body表示只从POST等参数中获取，None表示两者
+        :param choices_only: 用户输入的值必须是插件中的选项之一（插件必须有text_value_list，如：SingleSelect）
         :return:
         """
         self.custom_error_dict = {}
@@ -322,58 +520,49 @@ class IntegerField(Field):
 
         widget = widget if widget else self.DEFAULT_WIDGET()
 
-        super(IntegerField, self).__init__(widget)
+        super(IntegerField, self).__init__(widget, async_validators, source, choices_only)
 
-    def valid(self, handler):
+    def check(self, input_value):
         """
-        从请求中获取用户输入的值并和规则进行比较
-        :param handler: Tornado处理请求的XXXHandler对象
-        :return:
+        将用户输入的值和规则进行比较
+        :param input_value: 用户输入的值
+        :return: (status, value, error)
         """
-        input_value = FrameworkFactory.get_framework().get_argument(handler, self.name, None)
-        # input_value = handler.get_argument(self.name, None)
-
-        self.value = input_value
+        value = input_value
 
         if not input_value:
             if not self.required:
-                self.status = True
-                return
+                return True, value, None
 
-            if self.custom_error_dict.get('required', None):
-                self.error = self.custom_error_dict['required']
-            else:
-                self.error = "%s is required" % self.name
-            return
+            return False, value, self.get_error('required', "%s is required" % self.name)
 
-        ret = re.match(self.REGULAR, input_value)
+        ret = self.matcher(input_value)
         if not ret:
-            if self.custom_error_dict.get('invalid', None):
-                self.error = self.custom_error_dict['invalid']
-            else:
-                self.error = "%s is invalid" % self.name
-            return
+            return False, value, self.get_error('invalid', "%s is invalid" % self.name)
 
-        input_value = int(input_value)
-        self.value = input_value
+        return self.check_value(int(input_value))
 
+    def check_json(self, input_value):
+        if is_natural(input_value):
+            # JSON中的非负整数无需正则验证
+            return self.check_value(input_value)
+        return super(IntegerField, self).check_json(input_value)
+
+    def check_value(self, value):
+        """
+        验证转换后的整数的范围
+        :param value: 整数
+        :return: (status, value, error)
+        """
         if self.max_value:
-            if input_value > self.max_value:
-                if self.custom_error_dict.get('max_value', None):
-                    self.error = self.custom_error_dict['max_value']
-                else:
-                    self.error = "%s max value is %s" % (self.name, self.max_value)
-                return
+            if value > self.max_value:
+                return False, value, self.get_error('max_value', "%s max value is %s" % (self.name, self.max_value))
 
         if self.min_value:
-            if input_value < self.min_value:
-                if self.custom_error_dict.get('min_value', None):
-                    self.error = self.custom_error_dict['min_value']
-                else:
-                    self.error = "%s min value is %s" % (self.name, self.min_value)
-                return
+            if value < self.min_value:
+                return False, value, self.get_error('min_value', "%s min value is %s" % (self.name, self.min_value))
 
-        self.status = True
+        return self.check_choices(value)
 
 
 class FloatField(Field):
@@ -383,7 +572,8 @@ class FloatField(Field):
     REGULAR = "^\d+(\.\d{1,2})?$"
     DEFAULT_WIDGET = Widget.InputText
 
-    def __init__(self, max_value=None, min_value=None, error=None, required=True, widget=None):
+    def __init__(self, max_value=None, min_value=None, error=None, required=True, widget=None, async_validators=None,
+                 source=None, choices_only=False):
         """
         :param error: 自定义错误信息
                       如：{
@@ -394,6 +584,9 @@ class FloatField(Field):
                          }
         :param required: 是否必须
         :param widget: 指定插件，用于生成HTML标签（默认生成Input标签）
+        :param async_validators: 异步验证函数列表，仅在 Form.is_valid_async 中执行，详见 Async.AsyncValidator
+        :param source: 参数来源，query表示只从GET参数中获取，body表示只从POST等参数中获取，None表示两者
+        :param choices_only: 用户输入的值必须是插件中的选项之一（插件必须有text_value_list，如：SingleSelect）
         :return:
         """
         self.custom_error_dict = {}
@@ -406,57 +599,48 @@ class FloatField(Field):
 
         widget = widget if widget else self.DEFAULT_WIDGET()
 
-        super(FloatField, self).__init__(widget)
+        super(FloatField, self).__init__(widget, async_validators, source, choices_only)
 
-    def valid(self, handler):
+    def check(self, input_value):
         """
-        从请求中获取用户输入的值并和规则进行比较
-        :param handler: Tornado处理请求的XXXHandler对象
-        :return:
+        将用户输入的值和规则进行比较
+        :param input_value: 用户输入的值
+        :return: (status, value, error)
         """
-        input_value = FrameworkFactory.get_framework().get_argument(handler, self.name, None)
-        # input_value = handler.get_argument(self.name, None)
-
-        self.value = input_value
+        value = input_value
         if not input_value:
             if not self.required:
-                self.status = True
-                return
+                return True, value, None
 
-            if self.custom_error_dict.get('required', None):
-                self.error = self.custom_error_dict['required']
-            else:
-                self.error = "%s is required" % self.name
-            return
+            return False, value, self.get_error('required', "%s is required" % self.name)
 
-        ret = re.match(self.REGULAR, input_value)
+        ret = self.matcher(input_value)
         if not ret:
-            if self.custom_error_dict.get('invalid', None):
-                self.error = self.custom_error_dict['invalid']
-            else:
-                self.error = "%s is invalid" % self.name
-            return
+            return False, value, self.get_error('invalid', "%s is invalid" % self.name)
 
-        input_value = float(input_value)
-        self.value = input_value
+        return self.check_value(float(input_value))
 
+    def check_json(self, input_value):
+        if is_natural(input_value):
+            # JSON中的非负整数无需正则验证；小数的位数需要按字符串验证
+            return self.check_value(float(input_value))
+        return super(FloatField, self).check_json(input_value)
+
+    def check_value(self, value):
+        """
+        验证转换后的浮点数的范围
+        :param value: 浮点数
+        :return: (status, value, error)
+        """
         if self.max_value:
-            if input_value > self.max_value:
-                if self.custom_error_dict.get('max_value', None):
-                    self.error = self.custom_error_dict['max_value']
-                else:
-                    self.error = "%s max value is %s" % (self.name, self.max_value)
-                return
+            if value > self.max_value:
+                return False, value, self.get_error('max_value', "%s max value is %s" % (self.name, self.max_value))
 
         if self.min_value:
-            if input_value < self.min_value:
-                if self.custom_error_dict.get('min_value', None):
-                    self.error = self.custom_error_dict['min_value']
-                else:
-                    self.error = "%s min value is %s" % (self.name, self.min_value)
-                return
+            if value < self.min_value:
+                return False, value, self.get_error('min_value', "%s min value is %s" % (self.name, self.min_value))
 
-        self.status = True
+        return self.check_choices(value)
 
 
 class StringListField(Field):
@@ -465,8 +649,10 @@ class StringListField(Field):
     """
     REGULAR = "^.*$"
     DEFAULT_WIDGET = Widget.InputMultiCheckBox
+    MULTIPLE = True
 
-    def __init__(self, ele_max_length=None, ele_min_length=None, error=None, required=True, widget=None):
+    def __init__(self, ele_max_length=None, ele_min_length=None, error=None, required=True, widget=None, async_validators=None,
+                 source=None, choices_only=False):
         """
         :param error: 自定义错误信息
                       如：{
@@ -477,6 +663,9 @@ class StringListField(Field):
                          }
         :param required: 是否必须
         :param widget: 指定插件，用于生成HTML标签（默认生成Input标签）
+        :param async_validators: 异步验证函数列表，仅在 Form.is_valid_async 中执行，详见 Async.AsyncValidator
+        :param source: 参数来源，query表示只从GET参数中获取，body表示只从POST等参数中获取，None表示两者
+        :param choices_only: 用户输入的值必须是插件中的选项之一（插件必须有text_value_list，如：SingleSelect）
         :return:
         """
         self.custom_error_dict = {}
@@ -489,57 +678,65 @@ class StringListField(Field):
 
         widget = widget if widget else self.DEFAULT_WIDGET()
 
-        super(StringListField, self).__init__(widget)
+        super(StringListField, self).__init__(widget, async_validators, source, choices_only)
 
-    def valid(self, handler):
+    def get_input(self, handler, framework=None):
         """
-        从请求中获取用户输入的值并和规则进行比较
+        从请求中获取用户输入或选择的多个值
         :param handler: Tornado处理请求的XXXHandler对象
+        :param framework: Web框架适配器对象，默认为当前上下文中的Web框架
         :return:
         """
-        input_value = FrameworkFactory.get_framework().get_arguments(handler, self.name, [])
-        # input_value = handler.get_arguments(self.name)
+        if framework is None:
+            framework = FrameworkFactory.get_framework()
+        return framework.get_arguments(handler, self.name, [])
 
-        self.value = input_value
+    def check(self, input_value):
+        """
+        将用户输入的值和规则进行比较
+        :param input_value: 用户输入的值
+        :return: (status, value, error)
+        """
+        value = input_value
 
         if not input_value:
             if not self.required:
-                self.status = True
-                return
+                return True, value, None
 
-            if self.custom_error_dict.get('required', None):
-                self.error = self.custom_error_dict['required']
-            else:
-                self.error = "%s is required" % self.name
-            return
+            return False, value, self.get_error('required', "%s is required" % self.name)
 
-        for value in input_value:
-            ret = re.match(self.REGULAR, value)
+        for element in input_value:
+            if self.cheap_first:
+                error = self.check_length(element)
+                if error:
+                    return False, value, error
+
+            ret = self.matcher(element)
             if not ret:
-                if self.custom_error_dict.get('element', None):
-                    self.error = self.custom_error_dict['element']
-                else:
-                    self.error = "element %s is invalid" % self.name
-                return
+                return False, value, self.get_error('element', "element %s is invalid" % self.name)
 
-            if self.ele_max_length:
-                if len(value) > self.ele_max_length:
-                    if self.custom_error_dict.get('ele_max_length', None):
-                        self.error = self.custom_error_dict['ele_max_length']
-                    else:
-                        self.error = "element %s max length is %s" % (self.name, self.ele_max_length)
-                    return
+            if not self.cheap_first:
+                error = self.check_length(element)
+                if error:
+                    return False, value, error
 
-            if self.ele_min_length:
+        return self.check_choices(value)
 
-                if len(value) < self.ele_min_length:
-                    if self.custom_error_dict.get('ele_min_length', None):
-                        self.error = self.custom_error_dict['ele_min_length']
-                    else:
-                        self.error = "element %s min length is %s" % (self.name, self.ele_min_length)
-                    return
+    def check_length(self, element):
+        """
+        验证列表中元素的长度
+        :param element: 列表中的元素
+        :return: 错误信息，验证通过时返回None
+        """
+        if self.ele_max_length:
+            if len(element) > self.ele_max_length:
+                return self.get_error('ele_max_length', "element %s max length is %s" % (self.name, self.ele_max_length))
 
-        self.status = True
+        if self.ele_min_length:
+            if len(element) < self.ele_min_length:
+                return self.get_error('ele_min_length', "element %s min length is %s" % (self.name, self.ele_min_length))
+
+        return None
 
 
 class IntegerListField(Field):
@@ -548,8 +745,10 @@ class IntegerListField(Field):
     """
     REGULAR = "^\d+$"
     DEFAULT_WIDGET = Widget.InputMultiCheckBox
+    MULTIPLE = True
 
-    def __init__(self, ele_max_value=None, ele_min_value=None, error=None, required=True, widget=None):
+    def __init__(self, ele_max_value=None, ele_min_value=None, error=None, required=True, widget=None, async_validators=None,
+                 source=None, choices_only=False):
         """
         :param error: 自定义错误信息
                       如：{
@@ -560,6 +759,9 @@ class IntegerListField(Field):
                          }
         :param required: 是否必须
         :param widget: 指定插件，用于生成HTML标签（默认生成Input标签）
+        :param async_validators: 异步验证函数列表，仅在 Form.is_valid_async 中执行，详见 Async.AsyncValidator
+        :param source: 参数来源，query表示只从GET参数中获取，body表示只从POST等参数中获取，None表示两者
+        :param choices_only: 用户输入的值必须是插件中的选项之一（插件必须有text_value_list，如：SingleSelect）
         :return:
         """
         self.custom_error_dict = {}
@@ -572,57 +774,170 @@ class IntegerListField(Field):
 
         widget = widget if widget else self.DEFAULT_WIDGET()
 
-        super(IntegerListField, self).__init__(widget)
+        super(IntegerListField, self).__init__(widget, async_validators, source, choices_only)
 
-    def valid(self, handler):
+    def get_input(self, handler, framework=None):
         """
-        从请求中获取用户输入的值并和规则进行比较
+        从请求中获取用户输入或选择的多个值
         :param handler: Tornado处理请求的XXXHandler对象
+        :param framework: Web框架适配器对象，默认为当前上下文中的Web框架
         :return:
         """
-        input_value = FrameworkFactory.get_framework().get_arguments(handler, self.name, [])
-        # input_value = handler.get_arguments(self.name)
-        self.value = input_value
+        if framework is None:
+            framework = FrameworkFactory.get_framework()
+        return framework.get_arguments(handler, self.name, [])
+
+    def check(self, input_value):
+        """
+        将用户输入的值和规则进行比较
+        :param input_value: 用户输入的值
+        :return: (status, value, error)
+        """
+        value = input_value
 
         if not input_value:
             if not self.required:
-                self.status = True
-                return
+                return True, value, None
 
-            if self.custom_error_dict.get('required', None):
-                self.error = self.custom_error_dict['required']
-            else:
-                self.error = "%s is required" % self.name
-            return
+            return False, value, self.get_error('required', "%s is required" % self.name)
 
         success_value_list = []
-        for value in input_value:
-            ret = re.match(self.REGULAR, value)
+        for element in input_value:
+            ret = self.matcher(element)
             if not ret:
-                if self.custom_error_dict.get('element', None):
-                    self.error = self.custom_error_dict['element']
-                else:
-                    self.error = "element %s is invalid" % self.name
-                return
-            value = int(value)
-            success_value_list.append(value)
+                return False, value, self.get_error('element', "element %s is invalid" % self.name)
+            element = int(element)
+            success_value_list.append(element)
+
+            if self.ele_max_value:
+                if element > self.ele_max_value:
+                    return False, value, self.get_error('ele_max_value', "element %s max value is %s" % (self.name, self.ele_max_value))
+
+            if self.ele_min_value:
+
+                if element < self.ele_min_value:
+                    return False, value, self.get_error('ele_min_value', "element %s min value is %s" % (self.name, self.ele_min_value))
+
+        return self.check_choices(success_value_list)
 
+    def check_json(self, input_value):
+        if not isinstance(input_value, list) or not input_value or not all([is_natural(e) for e in input_value]):
+            return super(IntegerListField, self).check_json(input_value)
+
+        # JSON中的非负整数无需正则验证
+        for element in input_value:
             if self.ele_max_value:
-                if value > self.ele_max_value:
-                    if self.custom_error_dict.get('ele_max_value', None):
-                        self.error = self.custom_error_dict['ele_max_value']
-                    else:
-                        self.error = "element %s max value is %s" % (self.name, self.ele_max_value)
-                    return
+                if element > self.ele_max_value:
+                    return False, input_value, self.get_error('ele_max_value', "element %s max value is %s" % (self.name, self.ele_max_value))
 
             if self.ele_min_value:
+                if element < self.ele_min_value:
+                    return False, input_value, self.get_error('ele_min_value', "element %s min value is %s" % (self.name, self.ele_min_value))
+
+        return self.check_choices(list(input_value))
 
-                if value < self.ele_min_value:
-                    if self.custom_error_dict.get('ele_min_value', None):
-                        self.error = self.custom_error_dict['ele_min_value']
-                    else:
-                        self.error = "element %s min value is %s" % (self.name, self.ele_min_value)
-                    return
 
-        self.value = success_value_list
-        self.status = True
\ No newline at end of file
+class BoundField(object):
+    """
+    Form实例中的字段，仅保存本次请求的状态（value、error、status），验证规则和插件由Form类中编译好的字段共享
+    使用__slots__，每个请求不为字段创建__dict__
+    PS:
+        通过BoundField访问插件等可修改的配置时（如：form.username.widget.attr['class'] = 'error'），
+        先为本次请求复制一份字段（写时复制），修改不会影响其他请求
+    """
+    __slots__ = ('field', 'name', 'status', 'value', 'error', 'private')
+    # 访问时复制到本次请求中的配置
+    PRIVATE_ATTRS = frozenset(['widget', 'custom_error_dict', 'async_validators'])
+
+    def __init__(self, field):
+        """
+        :param field: Form类中编译好的字段
+        :return:
+        """
+        self.field = field
+        self.name = field.name
+        self.status = False
+        self.value = None
+        self.error = None
+        self.private = False
+
+    def __getattr__(self, item):
+        # 验证规则等配置从共享的字段中读取，如：required、max_length
+        if item in BoundField.PRIVATE_ATTRS and not self.private:
+            self.make_private()
+        return getattr(self.field, item)
+
+    def make_private(self):
+        """
+        为本次请求复制字段及其插件、自定义错误信息，之后的验证和生成HTML都使用复制的字段
+        :return:
+        """
+        field = copy.copy(self.field)
+        field.widget = copy.deepcopy(self.field.widget)
+        if isinstance(field.widget, Widget.BaseWidget):
+            # 复制的插件使用新的版本号，避免与共享插件的HTML片段缓存混淆
+            field.widget.touch()
+        field.custom_error_dict = dict(getattr(self.field, 'custom_error_dict', {}))
+        field.async_validators = list(self.field.async_validators)
+        field._choice_index = None
+        self.field = field
+        self.private = True
+
+    def valid(self, handler, framework=None):
+        """
+        从请求中获取用户输入的值并和规则进行比较
+        :param handler: Tornado处理请求的XXXHandler对象
+        :param framework: Web框架适配器对象，默认为当前上下文中的Web框架
+        :return:
+        """
+        field = self.field
+        if field.legacy_valid:
+            # 只重写了valid的自定义字段会修改字段自身，在本次请求复制的字段上执行
+            field = copy.copy(field)
+            if framework is None:
+                field.valid(handler)
+            else:
+                with FrameworkFactory.use_framework(framework):
+                    field.valid(handler)
+            self.status, self.value, self.error = field.status, field.value, field.error
+            return
+        input_value = field.get_input(handler) if framework is None else field.get_input(handler, framework)
+        self.status, self.value, self.error = field.check(input_value)
+
+    def clean(self, input_value):
+        """
+        将用户输入的值和规则进行比较
+        :param input_value: 用户输入的值，如：从请求参数快照中获取的值
+        :return:
+        """
+        self.status, self.value, self.error = self.field.check(input_value)
+
+    def clean_json(self, input_value):
+        """
+        将JSON中的值和规则进行比较
+        :param input_value: JSON中的值（原生类型）
+        :return:
+        """
+        self.status, self.value, self.error = self.field.check_json(input_value)
+
+    def __str__(self):
+        return self.field.render(self.value)
+
+    def iter_render(self):
+        """
+        分块生成HTML标签（生成器）
+        :return:
+        """
+        return self.field.iter_render(self.value)
+
+    def render_to(self, write):
+        """
+        将HTML标签分块写入，如：Tornado中的self.write
+        :param write: 写入函数
+        :return:
+        """
+        for chunk in self.iter_render():
+            write(chunk)
+
+    def set_value(self, value):
+        self.value = value
@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+FormSet：验证和生成N行相同的子表单（如：批量编辑），参数名称带有前缀和行号，如：items-0-price、items-1-price
+
+如：
+    class ItemForm(Form):
+        price = Fields.FloatField()
+        count = Fields.IntegerField()
+
+    class ItemFormSet(FormSet):
+        FORM = ItemForm
+        PREFIX = 'items'
+
+    formset = ItemFormSet(self)             # 行数从参数 items-TOTAL_FORMS 中获取，也可以通过total指定
+    if formset.is_valid():
+        print(formset.value_list)           # [{'price': 9.9, 'count': 1}, ...]
+    else:
+        print(formset.error_list)           # [{}, {'price': 'price is invalid'}, ...]
+    formset.render_to(self.write)
+PS:
+    所有行共享FORM类中编译好的字段，不为每行创建Form和BoundField，每行的状态只保存在value_list、error_list中
+    所有行的参数通过一次参数快照提取；生成HTML时每个字段使用名称为 items-__prefix__-price 的模板，之后只替换name属性中的行号，
+    有选项的插件（如：SingleSelect）中相同值的HTML只生成一次，缓存在render_cache中（RENDER_CACHE_SIZE）
+    行数超过MAX_ROWS时只验证前MAX_ROWS行，同时FormSet验证失败，错误信息保存在error中
+"""
+import collections
+import copy
+
+from Tyrion import Cache
+from Tyrion.Choices import choice_columns
+from Tyrion.Choices import choices_version
+from Tyrion.Compat import text_type
+from Tyrion.Compat import with_metaclass
+from Tyrion.Framework import FrameworkFactory
+
+# 参数快照所需的字段描述（名称带前缀和行号）
+PrefixedField = collections.namedtuple('PrefixedField', ['name', 'MULTIPLE', 'source'])
+
+PLACEHOLDER = '__prefix__'
+
+
+class FormSetMeta(type):
+    """
+    FormSet的元类，在类创建时为FORM中的每个字段生成一次HTML模板字段
+    """
+
+    def __new__(mcs, name, bases, attrs):
+        cls = super(FormSetMeta, mcs).__new__(mcs, name, bases, attrs)
+        templates = []
+        if cls.FORM is not None:
+            for k, field in cls.FORM.base_fields:
+                template = copy.copy(field)
+                template.widget = copy.deepcopy(field.widget)
+                template.widget.attr['name'] = '%s-%s-%s' % (cls.PREFIX, PLACEHOLDER, k)
+                templates.append((k, template))
+        cls.templates = tuple(templates)
+        # 模板name属性的开头，生成每行HTML时替换为带行号的前缀
+        cls.placeholder = "name='%s-%s-" % (cls.PREFIX, PLACEHOLDER)
+        cls.render_cache = Cache.LRUCache(cls.RENDER_CACHE_SIZE)
+        return cls
+
+
+class FormSet(with_metaclass(FormSetMeta, object)):
+    # 每行使用的Form类
+    FORM = None
+    # 参数名称的前缀
+    PREFIX = 'form'
+    # 最多验证的行数，超出时只验证前MAX_ROWS行并验证失败
+    MAX_ROWS = 1000
+    # HTML模板缓存的条目数
+    RENDER_CACHE_SIZE = 1024
+
+    def __init__(self, handler=None, total=None, framework=None):
+        """
+        :param handler: 请求对象
+        :param total: 行数，默认从参数 PREFIX-TOTAL_FORMS 中获取
+        :param framework: Web框架适配器对象，默认为当前上下文中的Web框架
+        :return:
+        """
+        self.handler = handler
+        self.framework = framework if framework is not None else FrameworkFactory.get_framework()
+        self.valid_status = True
+        # 与行无关的错误信息，如：行数超过MAX_ROWS
+        self.error = None
+        self.set_total(self.get_total() if total is None else total)
+
+    def set_total(self, total):
+        """
+        设置行数并重新创建每行的状态，超过MAX_ROWS时只保留前MAX_ROWS行并验证失败
+        :param total: 行数
+        :return:
+        """
+        if total > self.MAX_ROWS:
+            total = self.MAX_ROWS
+            self.error = "%s-TOTAL_FORMS max value is %s" % (self.PREFIX, self.MAX_ROWS)
+            self.valid_status = False
+        self.total = total
+        self.value_list = [{} for _ in range(total)]
+        self.error_list = [{} for _ in range(total)]
+        # 生成HTML时使用的值：验证通过时为验证后的值，否则为用户输入的值
+        self.display_list = [{} for _ in range(total)]
+
+    def get_total(self):
+        """
+        从参数 PREFIX-TOTAL_FORMS 中获取行数
+        :return:
+        """
+        if self.handler is None:
+            return 0
+        value = self.framework.get_argument(self.handler, '%s-TOTAL_FORMS' % self.PREFIX, None)
+        try:
+            return max(int(value), 0)
+        except (TypeError, ValueError):
+            return 0
+
+    def field_name(self, index, name):
+        return '%s-%s-%s' % (self.PREFIX, index, name)
+
+    def is_valid(self):
+        """
+        一次提取所有行的参数，按字段逐列验证
+        :return:
+        """
+        columns = []
+        fields = []
+        for k, field in self.FORM.base_fields:
+            names = [self.field_name(i, k) for i in range(self.total)]
+            columns.append((k, field, names))
+            fields.extend([PrefixedField(name, field.MULTIPLE, field.source) for name in names])
+        snapshot = self.framework.get_snapshot(self.handler, fields)
+        native = snapshot.native
+
+        for k, field, names in columns:
+            check = field.check_json if native else field.check
+            if field.MULTIPLE:
+                input_values = [snapshot.getlist(name, []) for name in names]
+            else:
+                input_values = [snapshot.get(name) for name in names]
+            for value_dict, error_dict, display, input_value in zip(
+                    self.value_list, self.error_list, self.display_list, input_values):
+                status, value, error = check(input_value)
+                display[k] = value
+                if status:
+                    value_dict[k] = value
+                else:
+                    error_dict[k] = error
+                    self.valid_status = False
+        return self.valid_status
+
+    def init_rows_value(self, value_list):
+        """
+        设置每行默认 显示的值 或 选中的值，同时设置行数（见set_total）
+        :param value_list: 每行的值，如：[{'price': 9.9}, {'price': 1}]
+        :return:
+        """
+        self.set_total(len(value_list))
+        self.display_list = [dict(value_dict) for value_dict in value_list[:self.total]]
+
+    def render_field(self, template, value):
+        """
+        生成带有占位符的字段HTML，有选项的插件中相同的值只生成一次
+        :return: HTML；值或选项中含有name属性的占位符时返回None（不能通过替换占位符生成）
+        """
+        widget = template.widget
+        choices = getattr(widget, 'text_value_list', None)
+        if choices is None:
+            # 无选项的插件生成HTML的开销小于缓存的开销
+            if value is None or (value.__class__ is text_type and self.placeholder not in value):
+                return template.render(value)
+            return None if self.contains_placeholder(value) else template.render(value)
+        key = (template.name, widget.attr.html(), widget.version, choices_version(choices), Cache.value_key(value))
+        html = self.render_cache.get(key, False)
+        if html is False:
+            values, texts, _ = choice_columns(choices)
+            if (value is not None and self.contains_placeholder(value)) or self.contains_placeholder(values) \
+                    or self.contains_placeholder(texts):
+                html = None
+            else:
+                html = template.render(value)
+            self.render_cache.set(key, html)
+        return html
+
+    def contains_placeholder(self, value):
+        placeholder = self.placeholder
+        if isinstance(value, (list, tuple)):
+            for element in value:
+                if placeholder in text_type(element):
+                    return True
+            return False
+        return placeholder in text_type(value)
+
+    def render_row(self, index, display):
+        """
+        逐个字段使用带行号名称的插件生成一行的HTML（不缓存），仅在值或选项中含有占位符时使用
+        """
+        html = []
+        for k, template in self.templates:
+            field = copy.copy(template)
+            field.widget = copy.deepcopy(template.widget)
+            field.widget.attr['name'] = self.field_name(index, k)
+            html.append(field.render(display.get(k)))
+        return ''.join(html)
+
+    def iter_render(self):
+        """
+        按行分块生成所有行的HTML标签（生成器），第一块为行数的隐藏标签 PREFIX-TOTAL_FORMS
+        :return:
+        """
+        yield "<input type='hidden' name='%s-TOTAL_FORMS' value='%s' />" % (self.PREFIX, self.total)
+        # 只替换name属性中的占位符，值和选项中不含该字符串（见render_field）
+        placeholder = self.placeholder
+        render_field = self.render_field
+        templates = self.templates
+        for i in range(self.total):
+            display = self.display_list[i] if i < len(self.display_list) else {}
+            html = [render_field(template, display.get(k)) for k, template in templates]
+            if None in html:
+                yield self.render_row(i, display)
+            else:
+                yield ''.join(html).replace(placeholder, "name='%s-%s-" % (self.PREFIX, i))
+
+    def render_to(self, write):
+        """
+        将所有行的HTML标签分块写入，如：Tornado中的self.write
+        :param write: 写入函数
+        :return:
+        """
+        for chunk in self.iter_render():
+            write(chunk)
+
+    def __str__(self):
+        return ''.join(self.iter_render())
+
+    @classmethod
+    def empty_form(cls):
+        """
+        名称中带有占位符 __prefix__ 的空行HTML，用于前端动态添加行
+        :return:
+        """
+        return ''.join([template.render(None) for _, template in cls.templates])
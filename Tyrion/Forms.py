@@ -1,17 +1,118 @@
 #!/usr/bin/env python
 # -*- coding:utf-8 -*-
 import copy
+import hashlib
+from Tyrion import Cache
+from Tyrion import Compiler
+from Tyrion import Metrics
+from Tyrion import Tracing
+from Tyrion.Compat import string_types
+from Tyrion.Compat import with_metaclass
 from Tyrion.Fields import Field
+from Tyrion.Fields import BoundField
+from Tyrion.Framework import FrameworkFactory
+from Tyrion.Framework import JSON
+from Tyrion.Framework import json_text
+from Tyrion.Planner import ValidationPlanner
 
 
-class Form(object):
-    def __init__(self, handler=None):
+def normalize_input(input_value, multiple):
+    """
+    将字典中的值转换为与Web框架中get_argument、get_arguments一致的格式（字符串）
+    记录中的原生类型（如：Stream.read_jsonl、数据库返回的int、float）转换为与表单提交一致的字符串，如：30 -> '30'
+    :param input_value: 用户输入的值
+    :param multiple: 是否为多值字段
+    :return:
+    """
+    if multiple:
+        if input_value is None:
+            return []
+        if not isinstance(input_value, (list, tuple)):
+            input_value = [input_value]
+        return [element if isinstance(element, string_types) else json_text(element) for element in input_value]
+    if isinstance(input_value, (list, tuple)):
+        # 与get_argument一致，多个值时取最后一个
+        input_value = input_value[-1] if input_value else None
+    if input_value is None or isinstance(input_value, string_types):
+        return input_value
+    return json_text(input_value)
+
+
+class FormMeta(type):
+    """
+    Form的元类，在类创建时合并MRO中声明的所有字段并编译一次，之后每个请求只需创建轻量的BoundField
+    """
+
+    def __new__(mcs, name, bases, attrs):
+        cls = super(FormMeta, mcs).__new__(mcs, name, bases, attrs)
+
+        declared = {}
+        for klass in reversed(cls.__mro__):
+            for k, v in klass.__dict__.items():
+                if isinstance(v, Field):
+                    declared[k] = v
+                elif k in declared:
+                    # 派生类中使用非字段属性覆盖（如：username = None），表示移除该字段
+                    declared.pop(k)
+
+        base_fields = []
+        for k, v in sorted(declared.items(), key=lambda item: item[1].creation_counter):
+            field = copy.deepcopy(v)
+            field.name = k
+            field.widget.attr['name'] = k
+            """
+            if 'id' not in field.widget.attr:
+                field.widget.attr['id'] = '%s_%s' % ('id', k)
+            """
+            field.cheap_first = cls.CHEAP_FIRST
+            field.form_name = name
+            base_fields.append((k, field))
+
+        cls.base_fields = tuple(base_fields)
+        # 不使用参数快照、直接从请求对象中验证的字段（只重写了valid或重写了get_input的自定义字段）
+        cls.handler_fields = frozenset([k for k, field in base_fields if field.legacy_valid or field.custom_input])
+        cls.planner = ValidationPlanner([k for k, _ in base_fields])
+        if cls.COMPILE and not Compiler.DEBUG and not cls.handler_fields:
+            compiled, cls.compiled_source = Compiler.compile_form(cls)
+            cls.compiled_is_valid = staticmethod(compiled)
+        else:
+            cls.compiled_is_valid, cls.compiled_source = None, None
+
+        if cls.RESULT_CACHE_SIZE:
+            cls.result_cache = Cache.ResultCache(cls.RESULT_CACHE_SIZE, cls.RESULT_CACHE_TTL)
+            cls.cached_fields = tuple((k, field.MULTIPLE) for k, field in base_fields
+                                      if field.cacheable and k not in cls.RESULT_CACHE_EXCLUDE
+                                      and k not in cls.handler_fields)
+        else:
+            cls.result_cache, cls.cached_fields = None, ()
+        return cls
+
+
+class Form(with_metaclass(FormMeta, object)):
+    # 先执行长度等开销较小的验证，再执行正则验证（同时存在多种错误时，返回的错误信息可能不同）
+    CHEAP_FIRST = False
+    # 任意字段验证失败后立即停止验证（适用于API接口），为False时验证所有字段
+    FAIL_FAST = False
+    # 根据统计的验证耗时，将开销较小的字段排在前面验证（配合FAIL_FAST使用）
+    ADAPTIVE_ORDER = False
+    # 类创建时将验证过程编译为一个函数（见Compiler），ADAPTIVE_ORDER为True或Compiler.DEBUG为True时不使用
+    COMPILE = False
+    # 验证结果缓存的条目数（为0时不缓存），相同的参数直接使用缓存的结果，如：重复提交、客户端重试
+    RESULT_CACHE_SIZE = 0
+    # 验证结果缓存的有效期（秒），为None时不过期
+    RESULT_CACHE_TTL = 60
+    # 不缓存验证结果的字段名称，如：验证码等结果不确定的字段（也可以在字段类中设置cacheable = False）
+    RESULT_CACHE_EXCLUDE = ()
+
+    def __init__(self, handler=None, framework=None):
         """
 
         :param handler: Tornado请求中的XXXHandler对象
+        :param framework: Web框架适配器对象，默认在创建时从当前上下文中获取一次（见 Tyrion.using）
         :return:
         """
         self.handler = handler
+        self._framework = framework if framework is not None else FrameworkFactory.get_framework()
         self.FiledDict = {}
         self.value_dict = {}
         self.error_dict = {}
@@ -21,36 +122,312 @@ class Form(object):
 
     def initialize(self):
         """
-        初始化，将派生类Form中的静态字段拷贝到字段FiledDict中，并为字段对应的Html插件设置id和name属性
+        初始化，为类中编译好的字段（base_fields）创建仅保存本次请求状态的BoundField，并放入字段FiledDict中
         :return:
         """
-        for k, v in self.__class__.__dict__.items():
-            if isinstance(v, Field):
-                field = copy.deepcopy(v)
-                field.name = k
-                field.widget.attr['name'] = k
-                """
-                if 'id' not in field.widget.attr:
-                    field.widget.attr['id'] = '%s_%s' % ('id', k)
-                """
-                self.FiledDict[k] = field
+        for k, field in self.base_fields:
+            self.FiledDict[k] = BoundField(field)
         self.__dict__.update(self.FiledDict)
 
-    def is_valid(self):
+    def is_valid(self, fail_fast=None):
         """
         验证用户输入和规则是否匹配
+        :param fail_fast: 任意字段验证失败后立即停止验证，默认使用FAIL_FAST
         :return:
         """
-        for k, v in self.FiledDict.items():
-            v.valid(self.handler)
+        if fail_fast is None:
+            fail_fast = self.FAIL_FAST
+        metrics = Metrics.registry if Metrics.registry.enabled else None
+        if metrics is not None:
+            form_start = metrics.timer()
+        tracer = Tracing.tracer
+        trace = tracer.start_form(self) if tracer.hooks else None
+        snapshot = self._framework.get_snapshot(
+            self.handler, [v.field for v in self.FiledDict.values()])
+
+        result_cache = self.result_cache
+        cached = None
+        if result_cache is not None:
+            cache_key = result_cache.snapshot_key(snapshot, self.cached_fields)
+            cached = result_cache.get(cache_key)
+
+        compiled = self.compiled_is_valid
+        if compiled is not None and cached is None and metrics is None and trace is None and not snapshot.native \
+                and not self.ADAPTIVE_ORDER and not Compiler.DEBUG and not self.has_private_fields():
+            compiled(self, snapshot, fail_fast)
+        else:
+            self.validate_snapshot(snapshot, fail_fast, cached, metrics, trace)
+
+        if metrics is not None:
+            metrics.observe_form(self.__class__.__name__, metrics.timer() - form_start, len(self.error_dict))
+        if trace is not None:
+            tracer.finish(trace, self.valid_status)
+        if result_cache is not None and cached is None and (self.valid_status or not fail_fast):
+            # 所有字段都已验证时才缓存结果
+            results = {}
+            for k, _ in self.cached_fields:
+                v = self.FiledDict[k]
+                results[k] = (v.status, list(v.value) if isinstance(v.value, list) else v.value, v.error)
+            result_cache.set(cache_key, results)
+        return self.valid_status
+
+    def has_private_fields(self):
+        """
+        本次请求中是否有字段复制了配置（如：form.username.custom_error_dict['required'] = '...'），
+        此时编译的验证函数中的错误信息等常量已经过期，需要解释执行
+        :return:
+        """
+        for v in self.FiledDict.values():
+            if v.private:
+                return True
+        return False
+
+    def validate_snapshot(self, snapshot, fail_fast, cached=None, metrics=None, trace=None):
+        """
+        逐个字段验证参数快照中的值（解释执行）
+        :param snapshot: 参数快照
+        :param fail_fast: 任意字段验证失败后立即停止验证
+        :param cached: 缓存的字段验证结果，如：{'username': (status, value, error)}，这些字段不再验证
+        :param metrics: 开启统计指标时为Metrics.registry
+        :param trace: 本次验证的追踪信息
+        :return:
+        """
+        planner = self.planner if self.ADAPTIVE_ORDER else None
+        timings = [] if planner and planner.should_sample() else None
+        order = planner.order if planner else self.FiledDict
+        timer = (metrics or planner).timer if timings is not None or metrics is not None else None
+        tracer = Tracing.tracer
+        native = snapshot.native
+        handler_fields = self.handler_fields
+
+        for k in order:
+            v = self.FiledDict[k]
+            if cached is not None and k in cached:
+                v.status, v.value, v.error = cached[k]
+                if isinstance(v.value, list):
+                    # 避免修改缓存中的值
+                    v.value = list(v.value)
+            else:
+                input_value = snapshot.getlist(k, []) if v.field.MULTIPLE else snapshot.get(k)
+                if trace is not None:
+                    field_trace = tracer.start_field(trace, v.field, input_value)
+                if timer is not None:
+                    start = timer()
+                if k in handler_fields:
+                    v.valid(self.handler, self._framework)
+                elif native:
+                    v.clean_json(input_value)
+                else:
+                    v.clean(input_value)
+                if trace is not None:
+                    tracer.finish(field_trace, v.status, v.error, v.field)
+                if timer is not None:
+                    elapsed = timer() - start
+                    if timings is not None:
+                        timings.append((k, elapsed))
+                    if metrics is not None:
+                        metrics.observe_field(v.field, elapsed, v.error)
+
             if v.status:
                 self.value_dict[k] = v.value
             else:
                 self.error_dict[k] = v.error
                 self.valid_status = False
+                if fail_fast:
+                    break
 
+        if timings:
+            planner.record(timings)
         return self.valid_status
 
+    def validate_fields(self, names, state=None, render=False):
+        """
+        只验证指定的字段（如：输入框失去焦点或输入时的实时验证），开销与Form中的字段总数无关
+        如：
+            state = session.setdefault('login_form', {})
+            errors, fragments = form.validate_fields(['username'], state=state, render=True)
+        :param names: 字段名称列表，如：['username']
+        :param state: 跨请求保存的字典（如：保存在session中，可以序列化为JSON），用户输入未变化的字段直接使用上次的验证结果
+        :param render: 为True时同时返回HTML发生变化的字段
+        PS:
+            只验证部分字段后valid_status为False，所有字段都验证通过后（如：逐个字段验证完或调用is_valid）才为True
+        :return: 指定字段的错误信息，如：{'username': 'username is required'}；
+                 render为True时返回 (错误信息, 发生变化的HTML片段)，如：({}, {'username': '<input ... />'})
+        """
+        for k in names:
+            if k not in self.FiledDict:
+                raise Exception('Form %s中不存在字段：%s' % (self.__class__.__name__, k))
+        snapshot = self._framework.get_snapshot(self.handler, [self.FiledDict[k].field for k in names])
+
+        errors = {}
+        fragments = {}
+        for k in names:
+            v = self.FiledDict[k]
+            input_value = snapshot.getlist(k, []) if v.field.MULTIPLE else snapshot.get(k)
+            previous = state.get(k) if state is not None else None
+            if previous is not None and previous['input'] == input_value:
+                v.status, v.value, v.error = previous['status'], previous['value'], previous['error']
+            elif k in self.handler_fields:
+                v.valid(self.handler, self._framework)
+            elif snapshot.native:
+                v.clean_json(input_value)
+            else:
+                v.clean(input_value)
+
+            if v.status:
+                self.value_dict[k] = v.value
+                self.error_dict.pop(k, None)
+            else:
+                self.value_dict.pop(k, None)
+                self.error_dict[k] = v.error
+                errors[k] = v.error
+
+            digest = previous.get('html') if previous is not None else None
+            if render and (digest is None or previous['input'] != input_value):
+                html = str(v)
+                digest = hashlib.md5(html.encode('utf-8')).hexdigest()
+                if previous is None or previous.get('html') != digest:
+                    fragments[k] = html
+
+            if state is not None:
+                state[k] = {'input': input_value, 'status': v.status, 'value': v.value, 'error': v.error,
+                            'html': digest}
+
+        # 只有所有字段都已验证通过时Form才有效，未验证的字段（status为False）使Form保持无效
+        self.valid_status = not self.error_dict and all([v.status for v in self.FiledDict.values()])
+        if render:
+            return errors, fragments
+        return errors
+
+    @classmethod
+    def from_json(cls, payload):
+        """
+        创建验证JSON对象的Form，如：
+            form = LoginForm.from_json(request.body)
+            if form.is_valid():
+                pass
+        PS:
+            创建时立即解析JSON，请求体不是合法的JSON对象时抛出ValueError（而不是在is_valid中出错），如：
+                try:
+                    form = LoginForm.from_json(request.body)
+                except ValueError:
+                    return 400
+        :param payload: 已解析的字典、JSON字符串或原始请求体（bytes）
+        :return:
+        """
+        framework = JSON()
+        return cls(framework.load(payload), framework=framework)
+
+    def is_valid_async(self, fail_fast=True):
+        """
+        验证用户输入和规则是否匹配，并发执行字段中声明的异步验证函数（仅支持Python3），如：await form.is_valid_async()
+        :param fail_fast: 为True时，任意字段验证失败后立即取消尚未完成的异步验证
+        :return:
+        异步验证函数抛出的异常会在取消其余异步验证后原样抛出，详见 Async.is_valid_async
+        """
+        from Tyrion import Async
+        return Async.is_valid_async(self, fail_fast)
+
+    @classmethod
+    def validate_many(cls, records):
+        """
+        批量验证多条记录，所有记录共享类中编译好的字段，不为每条记录创建Form或字段
+        :param records: 记录列表，如：[{'username': 'alex', 'hobby': ['1', '2']}, ...]
+                        或按列组织的字典，如：{'username': ['alex', 'eric'], 'hobby': [['1', '2'], ['3']]}
+        :return: 每条记录的验证结果列表，如：[(value_dict, error_dict), ...]
+        """
+        if isinstance(records, dict):
+            columns = records
+            row_count = max([len(column) for column in columns.values()] or [0])
+        else:
+            columns = None
+            row_count = len(records)
+
+        value_dict_list = [{} for _ in range(row_count)]
+        error_dict_list = [{} for _ in range(row_count)]
+
+        # 按字段逐列验证，字段的查找和方法绑定只发生一次
+        for k, field in cls.base_fields:
+            if columns is None:
+                column = [record.get(k) for record in records]
+            else:
+                column = list(columns.get(k, ()))
+                column.extend([None] * (row_count - len(column)))
+
+            check = field.check
+            multiple = field.MULTIPLE
+            for value_dict, error_dict, input_value in zip(value_dict_list, error_dict_list, column):
+                status, value, error = check(normalize_input(input_value, multiple))
+                if status:
+                    value_dict[k] = value
+                else:
+                    error_dict[k] = error
+
+        return list(zip(value_dict_list, error_dict_list))
+
+    @classmethod
+    def iter_validate(cls, records, max_errors=None):
+        """
+        逐条验证可迭代对象中的记录（生成器），不会一次性读取全部记录，内存占用与记录总数无关
+        如：
+            with open('users.csv') as f:
+                for row_no, value_dict, error_dict in UserForm.iter_validate(Stream.read_csv(f), max_errors=100):
+                    pass
+        :param records: 可迭代的记录，每条记录为字典，如：Stream.read_csv(f)、Stream.read_jsonl(f)
+        :param max_errors: 验证失败的记录数达到该值时停止验证
+        :return: 生成器，每次返回 (row_no, value_dict, error_dict)，row_no从1开始
+        """
+        fields = [(k, field.check, field.MULTIPLE) for k, field in cls.base_fields]
+        error_count = 0
+        for row_no, record in enumerate(records, 1):
+            value_dict = {}
+            error_dict = {}
+            for k, check, multiple in fields:
+                status, value, error = check(normalize_input(record.get(k), multiple))
+                if status:
+                    value_dict[k] = value
+                else:
+                    error_dict[k] = error
+
+            yield row_no, value_dict, error_dict
+
+            if error_dict:
+                error_count += 1
+                if max_errors and error_count >= max_errors:
+                    return
+
+    @classmethod
+    def validate_parallel(cls, records, workers=None, chunk_size=1000):
+        """
+        多进程并行验证大量记录，详见 Parallel.validate_parallel
+        :param records: 可迭代的记录，每条记录为字典
+        :param workers: 进程数，默认为CPU核数
+        :param chunk_size: 每个分块中的记录数
+        :return: 生成器，按原始顺序每次返回一条记录的验证结果 (value_dict, error_dict)
+        """
+        from Tyrion import Parallel
+        return Parallel.validate_parallel(cls, records, workers=workers, chunk_size=chunk_size)
+
+    def iter_render(self):
+        """
+        按字段顺序分块生成所有字段的HTML标签（生成器），如：
+            Tornado：  form.render_to(self.write)
+            WSGI：     return (chunk.encode('utf-8') for chunk in form.iter_render())
+        :return:
+        """
+        for v in self.FiledDict.values():
+            for chunk in v.iter_render():
+                yield chunk
+
+    def render_to(self, write):
+        """
+        将所有字段的HTML标签分块写入，如：Tornado中的self.write、io.StringIO().write
+        :param write: 写入函数
+        :return:
+        """
+        for chunk in self.iter_render():
+            write(chunk)
+
     def init_field_value(self, value_dict):
         """
         设置默认 显示的值 或 选中的值
@@ -59,4 +436,3 @@ class Form(object):
         """
         for k, v in self.FiledDict.items():
             v.set_value(value_dict.get(k, None))
-
@@ -1,9 +1,30 @@
 #!/usr/bin/env python
 # -*- coding:utf-8 -*-
+import contextlib
+import functools
+import json
+import threading
+
+from Tyrion.Compat import integer_types
+from Tyrion.Compat import text_type
+
+try:
+    from urllib.parse import unquote_to_bytes
+except ImportError:
+    from urllib import unquote as unquote_to_bytes
+
+try:
+    import contextvars
+except ImportError:
+    # Python3.7以下使用线程局部变量
+    contextvars = None
 
 
 class FrameworkFactory(object):
+    # 进程全局的Web框架，由Tyrion.setup设置
     __framework = None
+    # 当前上下文（线程、asyncio任务）绑定的Web框架，优先于全局的Web框架
+    __context = contextvars.ContextVar('tyrion_framework', default=None) if contextvars else threading.local()
 
     @staticmethod
     def set_framework(framework):
@@ -11,7 +32,87 @@ class FrameworkFactory(object):
 
     @staticmethod
     def get_framework():
-        return FrameworkFactory.__framework
+        if contextvars is not None:
+            framework = FrameworkFactory.__context.get()
+        else:
+            framework = getattr(FrameworkFactory.__context, 'framework', None)
+        return framework if framework is not None else FrameworkFactory.__framework
+
+    @staticmethod
+    def bind_framework(framework):
+        """
+        将Web框架绑定到当前上下文，不影响其他线程和asyncio任务
+        :param framework: Web框架适配器对象
+        :return: 用于reset_framework恢复之前绑定的token
+        """
+        if contextvars is not None:
+            return FrameworkFactory.__context.set(framework)
+        token = getattr(FrameworkFactory.__context, 'framework', None)
+        FrameworkFactory.__context.framework = framework
+        return token
+
+    @staticmethod
+    def reset_framework(token):
+        """
+        恢复bind_framework之前绑定的Web框架
+        :param token: bind_framework的返回值
+        :return:
+        """
+        if contextvars is not None:
+            FrameworkFactory.__context.reset(token)
+        else:
+            FrameworkFactory.__context.framework = token
+
+    @staticmethod
+    @contextlib.contextmanager
+    def use_framework(framework):
+        """
+        在with语句块中将Web框架绑定到当前上下文
+        :param framework: Web框架适配器对象
+        :return:
+        """
+        token = FrameworkFactory.bind_framework(framework)
+        try:
+            yield framework
+        finally:
+            FrameworkFactory.reset_framework(token)
+
+
+class ArgumentSnapshot(object):
+    """
+    请求参数的只读快照，由Web框架适配器一次性从请求中提取，Form中的所有字段都从快照中读取用户输入
+    """
+    __slots__ = ('_arguments',)
+    # 值是否为原生类型（JSON），为True时字段使用check_json验证
+    native = False
+
+    def __init__(self, arguments):
+        """
+        :param arguments: 字段名称和值列表的字典，如：{'username': ['alex'], 'hobby': ['1', '2']}
+        :return:
+        """
+        self._arguments = arguments
+
+    def get(self, name, default=None):
+        values = self._arguments.get(name)
+        if not values:
+            return default
+        return values[-1]
+
+    def getlist(self, name, default=None):
+        values = self._arguments.get(name)
+        if not values:
+            return default
+        return list(values)
+
+    def __contains__(self, name):
+        return name in self._arguments
+
+    def __iter__(self):
+        return iter(self._arguments)
+
+    def __len__(self):
+        return len(self._arguments)
 
 
 class BaseFramework(object):
@@ -21,6 +122,60 @@ class BaseFramework(object):
     def get_arguments(self, request, name, default=None):
         raise NotImplementedError('class %s must implement get_arguments method' % self.__class__)
 
+    def get_source(self, request, source):
+        """
+        获取请求中的参数来源，派生类可重写该方法，使一次快照只访问一次请求中的参数
+        :param request: 请求对象
+        :param source: 参数来源，query表示GET参数，body表示POST等参数，None表示两者
+        :return: 获取单值和多值的两个函数 (get, getlist)，调用方式为 get(name, None)、getlist(name)
+                 默认使用get_argument、get_arguments，忽略source
+        """
+        return functools.partial(self.get_argument, request), functools.partial(self.get_arguments, request)
+
+    def get_snapshot(self, request, fields):
+        """
+        一次性从请求中提取字段所需的参数，生成只读快照；未声明的参数和字段不需要的参数来源不会被读取
+        :param request: 请求对象
+        :param fields: 字段列表，根据字段的 name、MULTIPLE、source 提取参数
+        :return: ArgumentSnapshot对象
+        """
+        sources = {}
+        arguments = {}
+        for field in fields:
+            source = field.source
+            if source in sources:
+                get, getlist = sources[source]
+            else:
+                get, getlist = sources[source] = self.get_source(request, source)
+
+            name = field.name
+            if field.MULTIPLE:
+                values = getlist(name)
+                if values:
+                    arguments[name] = values
+            else:
+                value = get(name, None)
+                if value is not None:
+                    arguments[name] = [value]
+        return ArgumentSnapshot(arguments)
+
+
+class FallbackSource(object):
+    """
+    先从主参数来源中获取参数，值为空时再从备用参数来源中获取（Django中先POST后GET）
+    """
+    __slots__ = ('_primary', '_secondary')
+
+    def __init__(self, primary, secondary):
+        self._primary = primary
+        self._secondary = secondary
+
+    def get(self, name, default=None):
+        return self._primary.get(name) or self._secondary.get(name) or default
+
+    def getlist(self, name):
+        return self._primary.getlist(name) or self._secondary.getlist(name)
+
 
 class Tornado(BaseFramework):
     def get_argument(self, request, name, default=None):
@@ -54,6 +209,19 @@ class Tornado(BaseFramework):
             return value
         return default
 
+    def get_source(self, request, source):
+        """
+        获取请求中的参数来源
+        :param request: Tornado请求中的的 xxxHandler对象
+        :param source: 参数来源，query表示GET参数，body表示POST等参数，None表示两者
+        :return:
+        """
+        if source == 'query':
+            return request.get_query_argument, request.get_query_arguments
+        if source == 'body':
+            return request.get_body_argument, request.get_body_arguments
+        return request.get_argument, request.get_arguments
+
 
 class Django(BaseFramework):
     def get_argument(self, request, name, default=None):
@@ -87,6 +255,21 @@ class Django(BaseFramework):
             return get
         return default
 
+    def get_source(self, request, source):
+        """
+        获取请求中的参数来源，request.POST和request.GET只访问一次
+        :param request: Django中request参数
+        :param source: 参数来源，query表示GET参数，body表示POST参数，None表示两者（先POST后GET）
+        :return:
+        """
+        if source == 'query':
+            params = request.GET
+        elif source == 'body':
+            params = request.POST
+        else:
+            params = FallbackSource(request.POST, request.GET)
+        return params.get, params.getlist
+
 
 class Flask(BaseFramework):
     def get_argument(self, request, name, default=None):
@@ -120,6 +303,21 @@ class Flask(BaseFramework):
             return get_post
         return default
 
+    def get_source(self, request, source):
+        """
+        获取请求中的参数来源，request.values每次访问都会重新合并GET和POST，因此只访问一次
+        :param request: Flask框架中封装了用户请求的request
+        :param source: 参数来源，query表示GET参数，body表示POST参数，None表示两者
+        :return:
+        """
+        if source == 'query':
+            params = request.args
+        elif source == 'body':
+            params = request.form
+        else:
+            params = request.values
+        return params.get, params.getlist
+
 
 class Bottle(BaseFramework):
     def get_argument(self, request, name, default=None):
@@ -153,3 +351,250 @@ class Bottle(BaseFramework):
         if not get_post:
             return default
         return get_post
+
+    def get_source(self, request, source):
+        """
+        获取请求中的参数来源
+        :param request: Bottle框架中封装了用户请求的request
+        :param source: 参数来源，query表示GET参数，body表示POST参数，None表示两者
+        :return:
+        """
+        if source == 'query':
+            params = request.query
+        elif source == 'body':
+            params = request.forms
+        else:
+            params = request.params
+        return params.get, params.getall
+
+
+class WSGI(BaseFramework):
+    """
+    不依赖任何Web框架，直接从WSGI的environ中解析query string和application/x-www-form-urlencoded请求体
+    PS:
+        request 可以是WSGI的environ字典，也可以是原始的urlencoded请求体（bytes）
+        只解析Form中声明的参数，其他参数直接跳过；只对出现的参数进行百分号解码
+    """
+
+    def __init__(self, encoding='utf-8'):
+        """
+        :param encoding: 参数解码时使用的字符编码
+        :return:
+        """
+        self.encoding = encoding
+
+    def get_argument(self, request, name, default=None):
+        """
+        从请求中获取用户输入或选择的单值（同一参数出现多次时取最后一个）
+        :param request: WSGI的environ字典 或 原始请求体
+        :param name:
+        :param default:
+        :return:
+        """
+        values = self.parse(request, {name: None}).get(name)
+        if values:
+            return values[-1]
+        return default
+
+    def get_arguments(self, request, name, default=None):
+        """
+        从请求中获取用户输入或选择的多个值（列表类型）
+        :param request: WSGI的environ字典 或 原始请求体
+        :param name:
+        :param default:
+        :return:
+        """
+        values = self.parse(request, {name: None}).get(name)
+        if values:
+            return values
+        return default
+
+    def get_snapshot(self, request, fields):
+        """
+        一次性解析请求中字段所需的参数，生成只读快照
+        :param request: WSGI的environ字典 或 原始请求体
+        :param fields: 字段列表
+        :return: ArgumentSnapshot对象
+        """
+        return ArgumentSnapshot(self.parse(request, dict((field.name, field.source) for field in fields)))
+
+    def parse(self, request, sources):
+        """
+        解析请求中指定名称的参数，GET参数在前，POST参数在后
+        :param request: WSGI的environ字典 或 原始请求体
+        :param sources: 参数名称和参数来源的字典，如：{'username': None, 'page': 'query'}
+        :return: 参数名称和值列表的字典
+        """
+        arguments = {}
+        if isinstance(request, dict):
+            query = request.get('QUERY_STRING', '')
+            if query:
+                if not isinstance(query, bytes):
+                    # PEP 3333规定environ中的字符串使用latin-1解码，还原为原始字节
+                    query = query.encode('latin-1')
+                names = self.get_wanted_names(sources, 'query')
+                if names:
+                    self.parse_urlencoded(query, names, arguments)
+            body = read_body(request)
+        else:
+            body = request
+
+        if body:
+            names = self.get_wanted_names(sources, 'body')
+            if names:
+                self.parse_urlencoded(body, names, arguments)
+        return arguments
+
+    def get_wanted_names(self, sources, source):
+        """
+        获取需要从指定参数来源中解析的参数名称
+        :return: 参数名称的字节串和参数名称的字典，如：{b'username': 'username'}
+        """
+        names = {}
+        for name, field_source in sources.items():
+            if field_source is None or field_source == source:
+                names[name.encode(self.encoding)] = name
+        return names
+
+    def parse_urlencoded(self, data, names, arguments):
+        """
+        从urlencoded字节串中解析指定名称的参数，未声明的参数不会被解码
+        :param data: urlencoded字节串，如：b'username=alex&hobby=1&hobby=2'
+        :param names: 参数名称的字节串和参数名称的字典
+        :param arguments: 解析结果，参数名称和值列表的字典
+        :return:
+        """
+        encoding = self.encoding
+        for pair in data.split(b'&'):
+            key, _, value = pair.partition(b'=')
+            if b'%' in key or b'+' in key:
+                key = unquote_to_bytes(key.replace(b'+', b' '))
+            name = names.get(key)
+            if name is None:
+                continue
+            if b'%' in value or b'+' in value:
+                value = unquote_to_bytes(value.replace(b'+', b' '))
+            arguments.setdefault(name, []).append(value.decode(encoding, 'replace'))
+
+
+def json_text(value):
+    """
+    将JSON中的原生类型转换为与表单提交一致的字符串，如：1 -> '1'，True -> 'true'
+    :param value: JSON中的值
+    :return:
+    """
+    if value is None or isinstance(value, (text_type, str)):
+        return value
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, integer_types):
+        return text_type(value)
+    if isinstance(value, float):
+        return text_type(repr(value))
+    return json.dumps(value)
+
+
+class JSONSnapshot(object):
+    """
+    JSON对象的只读快照，值保持JSON中的原生类型（int、float、list等）
+    """
+    __slots__ = ('_data',)
+    native = True
+
+    def __init__(self, data):
+        self._data = data
+
+    def get(self, name, default=None):
+        value = self._data.get(name)
+        if value is None:
+            return default
+        return value
+
+    def getlist(self, name, default=None):
+        value = self._data.get(name)
+        if value is None:
+            return default
+        if isinstance(value, list):
+            return list(value)
+        return [value]
+
+    def __contains__(self, name):
+        return name in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class JSON(BaseFramework):
+    """
+    直接验证JSON对象，无需转换为表单参数，如：LoginForm.from_json(request.body)
+    PS:
+        request 可以是已解析的字典，也可以是JSON字符串或原始请求体（bytes）
+        字段使用check_json验证，值的类型已经能证明格式正确时（如：IntegerField中的int）跳过正则验证
+    """
+
+    def __init__(self, encoding='utf-8'):
+        """
+        :param encoding: 请求体为bytes时使用的字符编码
+        :return:
+        """
+        self.encoding = encoding
+
+    def load(self, request):
+        """
+        解析JSON对象
+        :param request: 字典、JSON字符串或bytes
+        :return: 字典
+        请求体无法解码、不是合法的JSON或不是JSON对象时抛出ValueError（调用方可以据此返回400）
+        """
+        try:
+            if isinstance(request, bytes):
+                request = request.decode(self.encoding)
+            if isinstance(request, (text_type, str)):
+                request = json.loads(request) if request.strip() else {}
+        except ValueError as e:
+            raise ValueError('JSON数据格式错误：%s' % e)
+        if request is None:
+            return {}
+        if not isinstance(request, dict):
+            raise ValueError('JSON数据必须为对象（字典），当前为：%s' % type(request).__name__)
+        return request
+
+    def get_argument(self, request, name, default=None):
+        value = JSONSnapshot(self.load(request)).get(name)
+        if value is None or isinstance(value, (list, dict)):
+            return default
+        return json_text(value)
+
+    def get_arguments(self, request, name, default=None):
+        values = JSONSnapshot(self.load(request)).getlist(name)
+        if not values:
+            return default
+        return [json_text(value) for value in values]
+
+    def get_snapshot(self, request, fields):
+        return JSONSnapshot(self.load(request))
+
+
+def read_body(environ):
+    """
+    读取application/x-www-form-urlencoded请求体，读取后缓存在environ中，可以被多次读取
+    :param environ: WSGI的environ字典
+    :return: 请求体字节串
+    """
+    body = environ.get('tyrion.body')
+    if body is None:
+        body = b''
+        content_type = environ.get('CONTENT_TYPE', '')
+        if content_type.startswith('application/x-www-form-urlencoded'):
+            try:
+                length = int(environ.get('CONTENT_LENGTH') or 0)
+            except ValueError:
+                length = 0
+            if length > 0:
+                body = environ['wsgi.input'].read(length)
+        environ['tyrion.body'] = body
+    return body
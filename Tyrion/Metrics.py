@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+验证和生成HTML的统计指标（默认关闭）：按Form类和字段统计调用次数、按错误类型统计失败次数、耗时直方图
+
+如：
+    from Tyrion import Metrics
+    Metrics.registry.enable()
+    Metrics.registry.snapshot()       # 字典，可序列化为JSON
+    Metrics.registry.prometheus()     # Prometheus文本格式，可直接作为 /metrics 的响应
+PS:
+    关闭时每次验证只多一次属性判断；开启时Form使用逐字段解释执行的验证过程（不使用Compiler生成的函数）
+"""
+import bisect
+import re
+import threading
+from timeit import default_timer
+
+# 耗时直方图的上界（秒）
+DEFAULT_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.1, 1.0)
+
+# 默认错误信息对应的错误类型，自定义错误信息通过字段的custom_error_dict反查
+_ERROR_PATTERNS = (
+    (re.compile(r'^element .* max length is .*$'), 'ele_max_length'),
+    (re.compile(r'^element .* min length is .*$'), 'ele_min_length'),
+    (re.compile(r'^element .* max value is .*$'), 'ele_max_value'),
+    (re.compile(r'^element .* min value is .*$'), 'ele_min_value'),
+    (re.compile(r'^element .* is not a valid choice$'), 'choice'),
+    (re.compile(r'^element .* is invalid$'), 'element'),
+    (re.compile(r'^.* is required$'), 'required'),
+    (re.compile(r'^.* is not a valid choice$'), 'choice'),
+    (re.compile(r'^.* is invalid$'), 'invalid'),
+    (re.compile(r'^.* max length is .*$'), 'max_length'),
+    (re.compile(r'^.* min length is .*$'), 'min_length'),
+    (re.compile(r'^.* max value is .*$'), 'max_value'),
+    (re.compile(r'^.* min value is .*$'), 'min_value'),
+    (re.compile(r'^.* timed out$'), 'timeout'),
+)
+
+
+def error_type(field, error):
+    """
+    根据错误信息获取错误类型，如：required、invalid、max_length，无法识别时返回other
+    :param field: 字段
+    :param error: 错误信息
+    :return:
+    """
+    for key, message in getattr(field, 'custom_error_dict', {}).items():
+        if message == error:
+            return key
+    for pattern, key in _ERROR_PATTERNS:
+        if pattern.match(error):
+            return key
+    return 'other'
+
+
+class Histogram(object):
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def to_dict(self):
+        """
+        :return: {'buckets': [(上界, 累计次数), ...], 'sum': 总耗时, 'count': 次数}，最后一个上界为'+Inf'
+        """
+        cumulative = []
+        total = 0
+        for bound, count in zip(list(self.buckets) + ['+Inf'], self.counts):
+            total += count
+            cumulative.append((bound, total))
+        return {'buckets': cumulative, 'sum': self.sum, 'count': self.count}
+
+
+class Stat(object):
+    """
+    一个Form类、字段或插件的统计数据
+    """
+
+    def __init__(self, buckets):
+        self.calls = 0
+        self.failures = {}
+        self.latency = Histogram(buckets)
+
+    def to_dict(self):
+        return {
+            'calls': self.calls,
+            'failures': dict(self.failures),
+            'latency': self.latency.to_dict(),
+        }
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _labels(**labels):
+    return ','.join('%s="%s"' % (k, _escape(v)) for k, v in sorted(labels.items()))
+
+
+class MetricsRegistry(object):
+    timer = staticmethod(default_timer)
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.enabled = False
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.forms = {}
+            self.fields = {}
+            self.renders = {}
+
+    def _stat(self, table, key):
+        stat = table.get(key)
+        if stat is None:
+            stat = table[key] = Stat(self.buckets)
+        return stat
+
+    def observe_form(self, form_name, seconds, errors):
+        """
+        记录一次Form验证
+        :param form_name: Form类的名称
+        :param seconds: 耗时
+        :param errors: 验证失败的字段数
+        :return:
+        """
+        with self._lock:
+            stat = self._stat(self.forms, form_name)
+            stat.calls += 1
+            stat.latency.observe(seconds)
+            if errors:
+                stat.failures['invalid'] = stat.failures.get('invalid', 0) + 1
+
+    def observe_field(self, field, seconds, error):
+        """
+        记录一次字段验证
+        :param field: 字段
+        :param seconds: 耗时
+        :param error: 错误信息，验证通过时为None
+        :return:
+        """
+        key = error_type(field, error) if error else None
+        with self._lock:
+            stat = self._stat(self.fields, (field.form_name, field.name))
+            stat.calls += 1
+            stat.latency.observe(seconds)
+            if key:
+                stat.failures[key] = stat.failures.get(key, 0) + 1
+
+    def observe_render(self, field, seconds):
+        """
+        记录一次生成HTML
+        :param field: 字段
+        :param seconds: 耗时
+        :return:
+        """
+        with self._lock:
+            stat = self._stat(self.renders, (field.form_name, field.name, field.widget.__class__.__name__))
+            stat.calls += 1
+            stat.latency.observe(seconds)
+
+    def iter_render(self, field, chunks):
+        """
+        统计分块生成HTML的总耗时（不包括调用方处理每个分块的时间）
+        """
+        elapsed = 0.0
+        iterator = iter(chunks)
+        while True:
+            start = self.timer()
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                elapsed += self.timer() - start
+            yield chunk
+        self.observe_render(field, elapsed)
+
+    def snapshot(self):
+        """
+        :return: 字典，如：{'forms': {'LoginForm': {...}}, 'fields': {'LoginForm': {'username': {...}}}, 'renders': {...}}
+        """
+        with self._lock:
+            fields = {}
+            for (form_name, name), stat in self.fields.items():
+                fields.setdefault(form_name, {})[name] = stat.to_dict()
+            renders = {}
+            for (form_name, name, widget), stat in self.renders.items():
+                data = stat.to_dict()
+                data['widget'] = widget
+                renders.setdefault(form_name, {})[name] = data
+            return {
+                'forms': dict((k, v.to_dict()) for k, v in self.forms.items()),
+                'fields': fields,
+                'renders': renders,
+            }
+
+    def prometheus(self, prefix='tyrion'):
+        """
+        :return: Prometheus文本格式（text/plain; version=0.0.4）
+        """
+        with self._lock:
+            groups = (
+                ('form', self.forms, lambda key: {'form': key}),
+                ('field', self.fields, lambda key: {'form': key[0], 'field': key[1]}),
+                ('render', self.renders, lambda key: {'form': key[0], 'field': key[1], 'widget': key[2]}),
+            )
+            lines = []
+            for kind, table, get_labels in groups:
+                items = sorted(table.items(), key=lambda item: repr(item[0]))
+                name = '%s_%s_calls_total' % (prefix, kind)
+                lines.append('# TYPE %s counter' % name)
+                for key, stat in items:
+                    lines.append('%s{%s} %s' % (name, _labels(**get_labels(key)), stat.calls))
+
+                if kind != 'render':
+                    name = '%s_%s_failures_total' % (prefix, kind)
+                    lines.append('# TYPE %s counter' % name)
+                    for key, stat in items:
+                        for error, count in sorted(stat.failures.items()):
+                            lines.append('%s{%s} %s' % (name, _labels(error=error, **get_labels(key)), count))
+
+                name = '%s_%s_duration_seconds' % (prefix, kind)
+                lines.append('# TYPE %s histogram' % name)
+                for key, stat in items:
+                    labels = get_labels(key)
+                    histogram = stat.latency.to_dict()
+                    for bound, count in histogram['buckets']:
+                        lines.append('%s_bucket{%s} %s' % (name, _labels(le=bound, **labels), count))
+                    lines.append('%s_sum{%s} %r' % (name, _labels(**labels), histogram['sum']))
+                    lines.append('%s_count{%s} %s' % (name, _labels(**labels), histogram['count']))
+            return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
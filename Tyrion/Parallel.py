@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+多进程并行验证大量记录
+
+如：
+    from Tyrion import Parallel
+
+    with open('users.csv') as f:
+        for value_dict, error_dict in Parallel.validate_parallel(UserForm, Stream.read_csv(f), workers=4):
+            pass
+"""
+import collections
+import itertools
+import multiprocessing
+
+# 工作进程中的Form类，由进程初始化函数设置一次，之后每个分块只需传递记录
+_worker_form = None
+
+
+def _init_worker(form_class):
+    global _worker_form
+    _worker_form = form_class
+
+
+def _validate_chunk(records):
+    return _worker_form.validate_many(records)
+
+
+def _iter_chunks(records, chunk_size):
+    iterator = iter(records)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def validate_parallel(form_class, records, workers=None, chunk_size=1000):
+    """
+    将记录分块后交给进程池并行验证，按原始顺序返回结果
+    PS：
+        Form类只在每个工作进程启动时传递一次（Form类必须可以被pickle，即：定义在可导入的模块中）
+        同时提交的分块数量有上限，配合 Stream.read_csv 等生成器使用时内存占用不随记录总数增长
+    :param form_class: Form的派生类
+    :param records: 可迭代的记录，每条记录为字典
+    :param workers: 进程数，默认为CPU核数
+    :param chunk_size: 每个分块中的记录数
+    :return: 生成器，每次返回一条记录的验证结果 (value_dict, error_dict)
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or multiprocessing.cpu_count()
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(form_class,))
+    max_pending = workers * 2
+    pending = collections.deque()
+    try:
+        for chunk in _iter_chunks(records, chunk_size):
+            pending.append(executor.submit(_validate_chunk, chunk))
+            if len(pending) >= max_pending:
+                for result in pending.popleft().result():
+                    yield result
+        while pending:
+            for result in pending.popleft().result():
+                yield result
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown()
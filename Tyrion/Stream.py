@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+流式读取和输出，配合 Form.iter_validate 验证大文件时内存占用保持不变
+
+如：
+    from Tyrion import Stream
+
+    with open('users.csv') as f:
+        results = UserForm.iter_validate(Stream.read_csv(f), max_errors=100)
+        for chunk in Stream.chunked(results, 1000):
+            writer.writerows(chunk)
+"""
+import csv
+import json
+
+
+def read_csv(file_obj, **kwargs):
+    """
+    逐行读取CSV文件，第一行为字段名称
+    :param file_obj: 已打开的文件对象
+    :param kwargs: csv.DictReader的其他参数，如：delimiter
+    :return: 生成器，每次返回一条记录（字典）
+    """
+    for row in csv.DictReader(file_obj, **kwargs):
+        yield row
+
+
+def read_jsonl(file_obj):
+    """
+    逐行读取JSON Lines文件，忽略空行
+    :param file_obj: 已打开的文件对象
+    :return: 生成器，每次返回一条记录（字典）
+    """
+    for line in file_obj:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def chunked(iterable, size):
+    """
+    将可迭代对象按指定大小分块，便于批量写入
+    :param iterable: 可迭代对象，如：Form.iter_validate的返回值
+    :param size: 每块的大小
+    :return: 生成器，每次返回一个列表
+    """
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
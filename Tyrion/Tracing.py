@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+验证和生成HTML的追踪钩子（默认没有钩子，不产生任何开销）
+
+钩子为TraceHook的派生类，按需实现以下方法，参数均为TraceContext：
+    before_form / after_form：    Form.is_valid 前后
+    before_field / after_field：  Form.is_valid 中每个字段验证前后
+    before_render / after_render：字段生成HTML前后（render、iter_render）
+
+如：记录耗时超过10ms的验证，只采样10%的请求
+    from Tyrion import Tracing
+    Tracing.tracer.add_hook(Tracing.SlowLogHook(threshold=0.01))
+    Tracing.tracer.sample_rate = 0.1
+PS:
+    TraceContext中只记录用户输入的长度，不记录用户输入的值
+    存在钩子时Form使用逐字段解释执行的验证过程（不使用Compiler生成的函数）
+"""
+import logging
+import random
+from timeit import default_timer
+
+from Tyrion.Metrics import error_type
+
+logger = logging.getLogger('Tyrion.trace')
+
+
+def input_size(value):
+    """
+    获取用户输入的长度，不保存值本身
+    :param value: 用户输入的值
+    :return: (字符数, 元素个数)，单值字段的元素个数为None
+    """
+    if value is None:
+        return 0, None
+    if isinstance(value, (list, tuple)):
+        return sum([input_size(element)[0] for element in value]), len(value)
+    try:
+        return len(value), None
+    except TypeError:
+        return len(str(value)), None
+
+
+class TraceContext(object):
+    """
+    一次验证或生成HTML的追踪信息
+    """
+    __slots__ = ('kind', 'form', 'field', 'widget', 'input_size', 'element_count',
+                 'start', 'duration', 'status', 'error_type', 'fields')
+
+    def __init__(self, kind, form, field=None, widget=None, value=None):
+        """
+        :param kind: form、field、render
+        :param form: Form类的名称
+        :param field: 字段名称
+        :param widget: 插件类的名称
+        :param value: 用户输入的值，只记录其长度
+        :return:
+        """
+        self.kind = kind
+        self.form = form
+        self.field = field
+        self.widget = widget
+        self.input_size, self.element_count = input_size(value)
+        self.start = None
+        self.duration = None
+        self.status = None
+        self.error_type = None
+        # Form的追踪信息中包含已验证字段的追踪信息
+        self.fields = []
+
+    def to_dict(self):
+        data = dict((k, getattr(self, k)) for k in self.__slots__ if k != 'fields')
+        data['fields'] = [field.to_dict() for field in self.fields]
+        return data
+
+
+class TraceHook(object):
+    def before_form(self, context):
+        pass
+
+    def after_form(self, context):
+        pass
+
+    def before_field(self, context):
+        pass
+
+    def after_field(self, context):
+        pass
+
+    def before_render(self, context):
+        pass
+
+    def after_render(self, context):
+        pass
+
+
+class SlowLogHook(TraceHook):
+    """
+    记录耗时超过阈值的验证和生成HTML：Form类、各字段耗时和输入长度，不记录用户输入的值
+    """
+
+    def __init__(self, threshold=0.01, render_threshold=None, log=None):
+        """
+        :param threshold: Form验证的耗时阈值（秒）
+        :param render_threshold: 生成HTML的耗时阈值（秒），默认与threshold相同
+        :param log: logging.Logger对象，默认为 Tyrion.trace
+        :return:
+        """
+        self.threshold = threshold
+        self.render_threshold = threshold if render_threshold is None else render_threshold
+        self.log = log if log else logger
+
+    def after_form(self, context):
+        if context.duration < self.threshold:
+            return
+        details = []
+        for field in context.fields:
+            detail = '%s=%.3fms size=%s' % (field.field, field.duration * 1000, field.input_size)
+            if field.element_count is not None:
+                detail += ' elements=%s' % field.element_count
+            if field.error_type:
+                detail += ' error=%s' % field.error_type
+            details.append(detail)
+        self.log.warning('slow validation: %s %.3fms [%s]', context.form, context.duration * 1000, ', '.join(details))
+
+    def after_render(self, context):
+        if context.duration < self.render_threshold:
+            return
+        self.log.warning('slow render: %s.%s (%s) %.3fms', context.form, context.field, context.widget,
+                         context.duration * 1000)
+
+
+class Tracer(object):
+    timer = staticmethod(default_timer)
+
+    def __init__(self, sample_rate=1.0):
+        """
+        :param sample_rate: 采样率（0~1），Form验证和生成HTML分别采样，字段随所属的Form一起采样
+        :return:
+        """
+        self.hooks = []
+        self.sample_rate = sample_rate
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+
+    def sampled(self):
+        rate = self.sample_rate
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def dispatch(self, method, context):
+        for hook in self.hooks:
+            try:
+                getattr(hook, method)(context)
+            except Exception:
+                # 钩子中的异常不影响验证
+                logger.exception('trace hook %r failed in %s', hook, method)
+
+    def start_form(self, form):
+        """
+        开始追踪一次Form验证
+        :param form: Form对象
+        :return: TraceContext，本次未被采样时返回None
+        """
+        if not self.sampled():
+            return None
+        context = TraceContext('form', form.__class__.__name__)
+        self.dispatch('before_form', context)
+        context.start = self.timer()
+        return context
+
+    def start_field(self, form_context, field, input_value):
+        context = TraceContext('field', form_context.form, field.name, value=input_value)
+        form_context.fields.append(context)
+        self.dispatch('before_field', context)
+        context.start = self.timer()
+        return context
+
+    def start_render(self, field, value):
+        if not self.sampled():
+            return None
+        context = TraceContext('render', field.form_name, field.name, field.widget.__class__.__name__, value)
+        self.dispatch('before_render', context)
+        context.start = self.timer()
+        return context
+
+    def finish(self, context, status=True, error=None, field=None):
+        """
+        结束追踪并调用after_XXX钩子
+        :param context: start_XXX返回的TraceContext
+        :param status: 是否验证通过
+        :param error: 错误信息，只记录错误类型
+        :param field: 产生错误的字段
+        :return:
+        """
+        context.duration = self.timer() - context.start
+        context.status = status
+        if error:
+            context.error_type = error_type(field, error)
+        self.dispatch('after_%s' % context.kind, context)
+
+    def iter_render(self, context, chunks):
+        """
+        追踪分块生成HTML，在最后一块生成后调用after_render（包括调用方处理分块的时间）
+        """
+        for chunk in chunks:
+            yield chunk
+        self.finish(context)
+
+
+tracer = Tracer()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+字段验证规则引擎：Field类创建时将其REGULAR编译为验证函数，内置规则使用不依赖正则的快速实现
+所有验证函数与 re.match(REGULAR, value) 的结果保持一致（包括 $ 允许匹配末尾的一个换行符）
+"""
+import re
+
+_DIGITS = re.compile(r'\d+\Z')
+
+if hasattr(str, 'isdecimal'):
+    # Python3中 \d 与 str.isdecimal 都匹配Unicode的十进制数字（Nd）
+    _isdecimal = str.isdecimal
+else:
+    def _isdecimal(value):
+        # Python2中未指定re.UNICODE时 \d 只匹配ASCII数字，不能使用unicode.isdecimal（如：u'\u0663'）
+        return _DIGITS.match(value) is not None
+
+
+def _strip_newline(value):
+    """
+    正则中的 $ 可以匹配字符串末尾换行符之前的位置
+    """
+    if value[-1:] == '\n':
+        return value[:-1]
+    return value
+
+
+def single_line(value):
+    r"""
+    等价于 re.match("^.*$", value)
+    """
+    index = value.find('\n')
+    return index == -1 or index == len(value) - 1
+
+
+def digits(value):
+    r"""
+    等价于 re.match("^\d+$", value)
+    """
+    return _isdecimal(_strip_newline(value))
+
+
+def decimal(value):
+    r"""
+    等价于 re.match("^\d+(\.\d{1,2})?$", value)
+    """
+    integer, dot, fraction = _strip_newline(value).partition('.')
+    if not _isdecimal(integer):
+        return False
+    if not dot:
+        return True
+    return len(fraction) <= 2 and _isdecimal(fraction)
+
+
+def ipv4(value):
+    r"""
+    等价于 re.match("^(25[0-5]|2[0-4]\d|[0-1]?\d?\d)(\.(25[0-5]|2[0-4]\d|[0-1]?\d?\d)){3}$", value)
+    """
+    octets = _strip_newline(value).split('.')
+    if len(octets) != 4:
+        return False
+    for octet in octets:
+        length = len(octet)
+        if length > 3 or not _isdecimal(octet):
+            return False
+        if length == 3:
+            # 三位数字时首位只能是0、1或2，以2开头时不能大于255
+            first = octet[0]
+            if first not in '01' and (first != '2' or octet > '255'):
+                return False
+    return True
+
+
+FAST_RULES = {
+    r"^.*$": single_line,
+    r"^\d+$": digits,
+    r"^\d+(\.\d{1,2})?$": decimal,
+    r"^(25[0-5]|2[0-4]\d|[0-1]?\d?\d)(\.(25[0-5]|2[0-4]\d|[0-1]?\d?\d)){3}$": ipv4,
+}
+
+
+def compile_rule(regular):
+    """
+    将正则表达式编译为验证函数，内置规则使用快速实现，自定义规则使用预编译的正则
+    :param regular: 正则表达式字符串，如：Field.REGULAR
+    :return: 验证函数，参数为用户输入的字符串，返回值为真表示匹配成功
+    """
+    rule = FAST_RULES.get(regular)
+    if rule:
+        return rule
+    return re.compile(regular).match
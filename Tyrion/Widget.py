@@ -1,8 +1,142 @@
 #!/usr/bin/env python
 # -*- coding:utf-8 -*-
+import itertools
+from Tyrion.Choices import choice_columns
+from Tyrion.Choices import selection_index
+from Tyrion.Choices import selection_key
 
+# 流式生成HTML时，每次输出的选项数量
+RENDER_CHUNK_SIZE = 256
 
-class Input(object):
+# 插件版本号，插件的任意属性被赋值时更新，用于HTML片段缓存
+_versions = itertools.count(1)
+
+
+class Attributes(dict):
+    """
+    HTML属性字典，缓存生成的属性字符串，属性被修改时缓存失效
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(Attributes, self).__init__(*args, **kwargs)
+        self._html = None
+
+    def html(self):
+        """
+        生成属性字符串，如：type='text' name='username'
+        :return:
+        """
+        if self._html is None:
+            self._html = ''.join(["%s='%s' " % (k, v,) for k, v in self.items()])
+        return self._html
+
+    def __setitem__(self, key, value):
+        self._html = None
+        super(Attributes, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._html = None
+        super(Attributes, self).__delitem__(key)
+
+    def clear(self):
+        self._html = None
+        super(Attributes, self).clear()
+
+    def pop(self, *args):
+        self._html = None
+        return super(Attributes, self).pop(*args)
+
+    def popitem(self):
+        self._html = None
+        return super(Attributes, self).popitem()
+
+    def setdefault(self, key, default=None):
+        self._html = None
+        return super(Attributes, self).setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        self._html = None
+        super(Attributes, self).update(*args, **kwargs)
+
+    def __ior__(self, other):
+        # Python3.9+ 中 attr |= {...} 不经过update
+        self.update(other)
+        return self
+
+    def replaced(self, key, value):
+        """
+        生成将某个属性替换为新值后的属性字符串，不修改自身
+        :param key: 属性名称，如：value
+        :param value: 属性值
+        :return:
+        """
+        if key not in self:
+            return "%s%s='%s' " % (self.html(), key, value,)
+        attr = Attributes(self)
+        attr[key] = value
+        return attr.html()
+
+
+class BaseWidget(object):
+    """
+    所有插件的基类，attr属性始终为Attributes对象
+    """
+    version = 0
+
+    def __setattr__(self, key, value):
+        super(BaseWidget, self).__setattr__(key, value)
+        super(BaseWidget, self).__setattr__('version', next(_versions))
+
+    def touch(self):
+        """
+        原地修改选项列表等可变属性后（如：text_value_list.append），调用该方法使HTML片段缓存失效
+        :return:
+        """
+        super(BaseWidget, self).__setattr__('version', next(_versions))
+
+    @property
+    def attr(self):
+        return self._attr
+
+    @attr.setter
+    def attr(self, value):
+        self._attr = value if isinstance(value, Attributes) else Attributes(value if value else {})
+
+    def render(self, value=None):
+        """
+        生成HTML标签，不修改插件自身（插件可能被多个请求共享）；派生类必须实现render和iter_render中的一个
+        :param value: 显示的值 或 选中的值，为None时使用插件自身的值
+        :return:
+        """
+        return ''.join(self.iter_render(value))
+
+    def iter_render(self, value=None):
+        """
+        分块生成HTML标签（生成器），选项较多的插件不需要一次性拼接完整的字符串
+        :param value: 显示的值 或 选中的值，为None时使用插件自身的值
+        :return:
+        """
+        yield self.render(value)
+
+    def render_to(self, write, value=None):
+        """
+        将HTML标签分块写入，如：Tornado中的self.write、io.StringIO().write
+        :param write: 写入函数
+        :param value: 显示的值 或 选中的值，为None时使用插件自身的值
+        :return:
+        """
+        for chunk in self.iter_render(value):
+            write(chunk)
+
+    def __str__(self):
+        """
+        使用对象时返回的字符串
+        :return:
+        """
+        return self.render()
+
+
+class Input(BaseWidget):
     def __init__(self, attr=None):
         """
         :param attr: 生成的HTML属性，如：{'id': '123'}
@@ -10,18 +144,15 @@ class Input(object):
         """
         self.attr = attr if attr else {}
 
-    def __str__(self):
+    def render(self, value=None):
         """
-        使用对象时返回的字符串
+        生成HTML标签
+        :param value: 显示的值，即：value属性
         :return:
         """
-        t = "<input %s />"
-        attr_list = []
-        for k, v in self.attr.items():
-            temp = "%s='%s' " % (k, v,)
-            attr_list.append(temp)
-        tag = t % (''.join(attr_list))
-        return tag
+        if value is None:
+            return "<input %s />" % self.attr.html()
+        return "<input %s />" % self.attr.replaced('value', value)
 
 
 class InputText(Input):
@@ -55,21 +186,18 @@ class InputSingleCheckBox(Input):
             attr_dict.update(attr)
         super(InputSingleCheckBox, self).__init__(attr_dict)
 
-    def __str__(self):
+    def render(self, value=None):
         """
-        使用对象时返回的字符串
+        生成HTML标签
+        :param value: 不为None时表示选中
         :return:
         """
-        t = "<input %s />"
-        attr_list = []
-        for k, v in self.attr.items():
-            temp = "%s='%s' " % (k, v,)
-            attr_list.append(temp)
-        tag = t % (''.join(attr_list))
-        return tag
+        if value is None:
+            return "<input %s />" % self.attr.html()
+        return "<input %s />" % self.attr.replaced('checked', 'checked')
 
 
-class InputMultiCheckBox(object):
+class InputMultiCheckBox(BaseWidget):
     def __init__(self, attr=None, text_value_list=None, checked_value_list=None):
         """
         :param attr: 生成的HTML属性，如：{'id': '123'}
@@ -80,6 +208,7 @@ class InputMultiCheckBox(object):
                                     {'value':3, 'text': '乒乓球'},
                                     {'value':4, 'text': '羽毛球'},
                                 ]
+                                也可以是多个插件共享的Choices.ChoiceProvider对象
         :param checked_value_list: 被选中的checked_value_list，如：[2,3]
         :return:
         """
@@ -88,32 +217,39 @@ class InputMultiCheckBox(object):
             attr_dict.update(attr)
         self.attr = attr_dict
 
-        self.text_value_list = text_value_list if text_value_list else []
+        self.text_value_list = text_value_list if text_value_list is not None else []
         self.checked_value_list = checked_value_list if checked_value_list else []
 
-    def __str__(self):
+    @property
+    def checked_value_list(self):
+        return self._checked_value_list
+
+    @checked_value_list.setter
+    def checked_value_list(self, value):
+        self._checked_value_list = value
+        self.checked_index = selection_index(value)
+
+    def iter_render(self, value=None):
         """
-        使用对象时返回的字符串
+        分块生成HTML标签，属性字符串只生成一次，每个选项只需格式化value和内容
+        :param value: 被选中的值列表，为None时使用checked_value_list
         :return:
         """
+        checked_index = self.checked_index if value is None else selection_index(value)
+        template = "<div><span><input %svalue='%%s' %%s /></span><span>%%s</span></div>" % (
+            self.attr.html().replace('%', '%%'),)
         tag_list = []
-        for item in self.text_value_list:
-            a = "<div><span>%s</span><span>%s</span></div>"
-            b = "<input %s />"
-            attr_list = []
-            for k, v in self.attr.items():
-                temp = "%s='%s' " % (k, v,)
-                attr_list.append(temp)
-            attr_list.append("%s='%s' " % ('value', item['value']))
-            if item['value'] in self.checked_value_list:
-                attr_list.append("checked='checked' ")
-            input_tag = b % (''.join(attr_list))
-            c = a % (input_tag, item['text'], )
-            tag_list.append(c)
-        return ''.join(tag_list)
-
-
-class InputRadio(object):
+        for item_value, text, key in zip(*choice_columns(self.text_value_list)):
+            checked = "checked='checked' " if key in checked_index else ""
+            tag_list.append(template % (item_value, checked, text,))
+            if len(tag_list) >= RENDER_CHUNK_SIZE:
+                yield ''.join(tag_list)
+                tag_list = []
+        if tag_list:
+            yield ''.join(tag_list)
+
+
+class InputRadio(BaseWidget):
     def __init__(self, attr=None, text_value_list=None, checked_value=None):
         """
         :param attr: 生成的HTML属性，如：{'id': '123'}
@@ -124,6 +260,7 @@ class InputRadio(object):
                                     {'value':3, 'text': '乒乓球'},
                                     {'value':4, 'text': '羽毛球'},
                                 ]
+                                也可以是多个插件共享的Choices.ChoiceProvider对象
         :param checked_value: 被选中的checked_value，如：2
         :return:
         """
@@ -132,32 +269,31 @@ class InputRadio(object):
             attr_dict.update(attr)
         self.attr = attr_dict
 
-        self.text_value_list = text_value_list if text_value_list else []
+        self.text_value_list = text_value_list if text_value_list is not None else []
         self.checked_value = checked_value
 
-    def __str__(self):
+    def iter_render(self, value=None):
         """
-        使用对象时返回的字符串
+        分块生成HTML标签，属性字符串只生成一次，每个选项只需格式化value和内容
+        :param value: 被选中的值，为None时使用checked_value
         :return:
         """
+        checked_value = self.checked_value if value is None else value
+        checked_key = None if checked_value is None else selection_key(checked_value)
+        template = "<div><span><input %svalue='%%s' %%s /></span><span>%%s</span></div>" % (
+            self.attr.html().replace('%', '%%'),)
         tag_list = []
-        for item in self.text_value_list:
-            a = "<div><span>%s</span><span>%s</span></div>"
-            b = "<input %s />"
-            attr_list = []
-            for k, v in self.attr.items():
-                temp = "%s='%s' " % (k, v,)
-                attr_list.append(temp)
-            attr_list.append("%s='%s' " % ('value', item['value']))
-            if item['value'] == self.checked_value:
-                attr_list.append("checked='checked' ")
-            input_tag = b % (''.join(attr_list))
-            c = a % (input_tag,item['text'])
-            tag_list.append(c)
-        return ''.join(tag_list)
-
-
-class SingleSelect(object):
+        for item_value, text, key in zip(*choice_columns(self.text_value_list)):
+            checked = "checked='checked' " if key == checked_key else ""
+            tag_list.append(template % (item_value, checked, text,))
+            if len(tag_list) >= RENDER_CHUNK_SIZE:
+                yield ''.join(tag_list)
+                tag_list = []
+        if tag_list:
+            yield ''.join(tag_list)
+
+
+class SingleSelect(BaseWidget):
     def __init__(self, attr=None, text_value_list=None, selected_value=None):
         """
         :param attr: 生成的HTML属性，如：{'id': '123'}
@@ -168,6 +304,7 @@ class SingleSelect(object):
                                     {'value':3, 'text': '乒乓球'},
                                     {'value':4, 'text': '羽毛球'},
                                 ]
+                                也可以是多个插件共享的Choices.ChoiceProvider对象
         :param selected_value: 被选中的checked_value，如：2
         :return:
         """
@@ -176,39 +313,34 @@ class SingleSelect(object):
             attr_dict.update(attr)
         self.attr = attr_dict
 
-        self.text_value_list = text_value_list if text_value_list else []
+        self.text_value_list = text_value_list if text_value_list is not None else []
         self.selected_value = selected_value
 
-    def __str__(self):
+    def iter_render(self, value=None):
         """
-        使用对象时返回的字符串
+        分块生成HTML标签
+        :param value: 被选中的值，为None时使用selected_value
         :return:
         """
-
-        a = "<select %s>%s</select>"
-
-        attr_list = []
-        for k, v in self.attr.items():
-            temp = "%s='%s' " % (k, v,)
-            attr_list.append(temp)
-
+        selected_value = self.selected_value if value is None else value
+        selected_key = None if selected_value is None else selection_key(selected_value)
+        yield "<select %s>" % self.attr.html()
         option_list = []
-
-        for item in self.text_value_list:
-
-            if item['value'] == self.selected_value:
+        for item_value, text, key in zip(*choice_columns(self.text_value_list)):
+            if key == selected_key:
                 b = "<option selected='selected' value='%s'>%s</option>"
             else:
                 b = "<option value='%s'>%s</option>"
-            option = b % (item['value'], item['text'],)
-            option_list.append(option)
-
-        tag = a % (''.join(attr_list), ''.join(option_list))
+            option_list.append(b % (item_value, text,))
+            if len(option_list) >= RENDER_CHUNK_SIZE:
+                yield ''.join(option_list)
+                option_list = []
+        if option_list:
+            yield ''.join(option_list)
+        yield "</select>"
 
-        return tag
 
-
-class MultiSelect(object):
+class MultiSelect(BaseWidget):
     def __init__(self, attr=None, text_value_list=None, selected_value_list=None):
         """
         :param attr: 生成的Select标签的属性，如：{'id': '123'}
@@ -219,6 +351,7 @@ class MultiSelect(object):
                                     {'value':3, 'text': '乒乓球'},
                                     {'value':4, 'text': '羽毛球'},
                                 ]
+                                也可以是多个插件共享的Choices.ChoiceProvider对象
         :param selected_value_list: selected_value_list，如：[2,3,4]
         :return:
         """
@@ -227,36 +360,42 @@ class MultiSelect(object):
             attr_dict.update(attr)
         self.attr = attr_dict
 
-        self.text_value_list = text_value_list if text_value_list else []
+        self.text_value_list = text_value_list if text_value_list is not None else []
         self.selected_value_list = selected_value_list if selected_value_list else []
 
-    def __str__(self):
+    @property
+    def selected_value_list(self):
+        return self._selected_value_list
+
+    @selected_value_list.setter
+    def selected_value_list(self, value):
+        self._selected_value_list = value
+        self.selected_index = selection_index(value)
+
+    def iter_render(self, value=None):
         """
-        使用对象时返回的字符串
+        分块生成HTML标签
+        :param value: 被选中的值列表，为None时使用selected_value_list
         :return:
         """
-
-        a = "<select %s>%s</select>"
-
-        attr_list = []
-        for k, v in self.attr.items():
-            temp = "%s='%s' " % (k, v,)
-            attr_list.append(temp)
-
+        selected_index = self.selected_index if value is None else selection_index(value)
+        yield "<select %s>" % self.attr.html()
         option_list = []
-        for item in self.text_value_list:
-            if item['value'] in self.selected_value_list:
+        for item_value, text, key in zip(*choice_columns(self.text_value_list)):
+            if key in selected_index:
                 b = "<option selected='selected' value='%s'>%s</option>"
             else:
                 b = "<option value='%s'>%s</option>"
-            option = b % (item['value'], item['text'],)
-            option_list.append(option)
-
-        tag = a % (''.join(attr_list), ''.join(option_list))
-        return tag
+            option_list.append(b % (item_value, text,))
+            if len(option_list) >= RENDER_CHUNK_SIZE:
+                yield ''.join(option_list)
+                option_list = []
+        if option_list:
+            yield ''.join(option_list)
+        yield "</select>"
 
 
-class TextArea(object):
+class TextArea(BaseWidget):
     def __init__(self, attr=None, value=""):
         """
         :param attr: 生成的HTML属性，如：{'id': '123'}
@@ -265,16 +404,10 @@ class TextArea(object):
         self.attr = attr if attr else {}
         self.value = value
 
-    def __str__(self):
+    def render(self, value=None):
         """
-        使用对象时返回的字符串
+        生成HTML标签
+        :param value: 显示的内容，为None时使用value
         :return:
         """
-        t = "<textarea %s>%s</textarea>"
-        attr_list = []
-        for k, v in self.attr.items():
-            temp = "%s='%s' " % (k, v,)
-            attr_list.append(temp)
-        tag = t % (''.join(attr_list), self.value)
-        return tag
-
+        return "<textarea %s>%s</textarea>" % (self.attr.html(), self.value if value is None else value,)
@@ -1,31 +1,59 @@
 #!/usr/bin/env python
 # -*- coding:utf-8 -*-
 from Tyrion.Framework import FrameworkFactory
+from Tyrion.Framework import BaseFramework
 from Tyrion.Framework import Tornado
 from Tyrion.Framework import Django
 from Tyrion.Framework import Bottle
 from Tyrion.Framework import Flask
+from Tyrion.Framework import WSGI
+from Tyrion.Framework import JSON
 
 
 __version__ = '1.0.1'
 
+FRAMEWORKS = {
+    'tornado': Tornado,
+    'django': Django,
+    'bottle': Bottle,
+    'flask': Flask,
+    'wsgi': WSGI,
+    'json': JSON,
+}
+
+
+def create_framework(framework):
+    """
+    根据Web框架的字符串表示创建适配器对象
+    :param framework: Web框架的字符串表示
+    :return:
+    """
+    cls = FRAMEWORKS.get(framework)
+    if not cls:
+        raise Exception('Tyrion模块setup方法参数必须为：%s （任意一种字符串）' % ','.join(FRAMEWORKS.keys()))
+    return cls()
+
+
 def setup(framework='tornado'):
     """
     设置Tyrion插件当前处理的Web框架
     :param framework: Web框架的字符串表示
     :return:
     """
-    framework_dict = {
-        'tornado': Tornado,
-        'django': Django,
-        'bottle': Bottle,
-        'flask': Flask
-    }
-    cls = framework_dict.get(framework)
-    if cls:
-        FrameworkFactory.set_framework(cls())
-    else:
-        raise Exception('Tyrion模块setup方法参数必须为：%s （任意一种字符串）' % ','.join(framework_dict.keys()))
+    FrameworkFactory.set_framework(create_framework(framework))
+
+
+def using(framework):
+    """
+    在当前上下文（线程、asyncio任务）中使用指定的Web框架，不影响其他请求，如：
+        with Tyrion.using('flask'):
+            form = LoginForm(request)
+    :param framework: Web框架的字符串表示或适配器对象
+    :return:
+    """
+    if not isinstance(framework, BaseFramework):
+        framework = create_framework(framework)
+    return FrameworkFactory.use_framework(framework)
 
 
 """
@@ -35,5 +63,10 @@ def setup(framework='tornado'):
     import Tyrion
     Tyrion.setup('tornado')
 
+同一进程中使用多种Web框架时，在每个请求中绑定当前的Web框架（或在创建Form时指定）：
+    with Tyrion.using('flask'):
+        form = LoginForm(request)
+    form = LoginForm(request, framework=Tyrion.create_framework('django'))
+
 """
 
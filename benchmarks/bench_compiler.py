@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+对比Form验证的两种执行方式：
+    interpreted：逐个字段调用BoundField.clean -> Field.check
+    compiled：   Form.COMPILE为True时，类创建时生成的专用验证函数
+
+运行方式：python -m benchmarks.bench_compiler
+"""
+import timeit
+
+import Tyrion
+from Tyrion import Fields
+from Tyrion.Forms import Form
+from benchmarks.fakes import make_request
+
+FIELD_COUNT = 20
+
+
+def build_form(name, compile_form):
+    attrs = {'COMPILE': compile_form}
+    for i in range(FIELD_COUNT):
+        if i % 4 == 0:
+            attrs['field_%s' % i] = Fields.IntegerField(max_value=1000, min_value=1)
+        elif i % 4 == 1:
+            attrs['field_%s' % i] = Fields.EmailField(max_length=64)
+        else:
+            attrs['field_%s' % i] = Fields.StringField(max_length=32, min_length=2)
+    attrs['hobby'] = Fields.IntegerListField(ele_max_value=10)
+    return type(name, (Form,), attrs)
+
+
+InterpretedForm = build_form('InterpretedForm', False)
+CompiledForm = build_form('CompiledForm', True)
+
+
+def make_arguments(valid):
+    arguments = {}
+    for i in range(FIELD_COUNT):
+        if i % 4 == 0:
+            arguments['field_%s' % i] = ['42' if valid else 'x']
+        elif i % 4 == 1:
+            arguments['field_%s' % i] = ['alex@live.com' if valid else 'alex']
+        else:
+            arguments['field_%s' % i] = ['value' if valid else 'v']
+    arguments['hobby'] = ['1', '2', '3'] if valid else ['1', '20']
+    return arguments
+
+
+def main(number=5000):
+    Tyrion.setup('tornado')
+    for label, valid in (('valid', True), ('invalid', False)):
+        request = make_request('tornado', make_arguments(valid))
+        for form_class in (InterpretedForm, CompiledForm):
+            seconds = min(timeit.repeat(lambda: form_class(request).is_valid(), number=number, repeat=3))
+            print('%-8s %-16s %8.2f us/form' % (label, form_class.__name__, seconds / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+对比每种内置字段的规则匹配开销：
+    regex： 旧版本中每次调用 re.match(REGULAR, value)
+    engine：类创建时编译好的验证函数 Field.matcher
+
+运行方式：python -m benchmarks.bench_fields
+"""
+import re
+import timeit
+
+from Tyrion import Fields
+
+CASES = (
+    (Fields.StringField, 'alex', 'alex\nsmith'),
+    (Fields.EmailField, 'alex@live.com', 'alex@live'),
+    (Fields.IPField, '192.168.10.254', '192.168.10.256'),
+    (Fields.IntegerField, '1024', '10.24'),
+    (Fields.FloatField, '10.24', '10.245'),
+    (Fields.StringListField, 'alex', 'alex\nsmith'),
+    (Fields.IntegerListField, '1024', '10.24'),
+)
+
+
+def main(number=200000):
+    for cls, valid_value, invalid_value in CASES:
+        for label, value in (('valid', valid_value), ('invalid', invalid_value)):
+            regex = min(timeit.repeat(lambda: re.match(cls.REGULAR, value), number=number, repeat=3))
+            engine = min(timeit.repeat(lambda: cls.matcher(value), number=number, repeat=3))
+            print('%-18s %-8s regex %6.0f ns   engine %6.0f ns' % (
+                cls.__name__, label, regex / number * 1e9, engine / number * 1e9))
+
+
+if __name__ == '__main__':
+    main()
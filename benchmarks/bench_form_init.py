@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+对比30个字段的Form在每个请求中的初始化开销：
+    before：旧版本中每个请求对所有字段及其插件执行copy.deepcopy
+    after： 字段在类创建时编译一次，每个请求只创建BoundField
+
+运行方式：python -m benchmarks.bench_form_init
+"""
+import copy
+import timeit
+
+import Tyrion
+from Tyrion import Fields
+from Tyrion.Forms import Form
+from benchmarks.fakes import FakeTornadoHandler
+
+FIELD_COUNT = 30
+
+attrs = {}
+for i in range(FIELD_COUNT):
+    if i % 3 == 0:
+        attrs['field_%s' % i] = Fields.StringField(max_length=32)
+    elif i % 3 == 1:
+        attrs['field_%s' % i] = Fields.IntegerField(max_value=1000)
+    else:
+        attrs['field_%s' % i] = Fields.EmailField()
+WideForm = type('WideForm', (Form,), attrs)
+
+
+def legacy_initialize(form):
+    """
+    旧版本Form.initialize的实现
+    """
+    for k, v in form.__class__.__dict__.items():
+        if isinstance(v, Fields.Field):
+            field = copy.deepcopy(v)
+            field.name = k
+            field.widget.attr['name'] = k
+            form.FiledDict[k] = field
+    form.__dict__.update(form.FiledDict)
+
+
+def before():
+    form = WideForm.__new__(WideForm)
+    form.handler = None
+    form.FiledDict = {}
+    form.value_dict = {}
+    form.error_dict = {}
+    form.valid_status = True
+    legacy_initialize(form)
+    return form
+
+
+def after():
+    WideForm()
+
+
+def main(number=2000):
+    Tyrion.setup('tornado')
+    handler = FakeTornadoHandler(dict(('field_%s' % i, ['1']) for i in range(FIELD_COUNT)))
+    form = WideForm(handler)
+    form.is_valid()
+
+    for name, func in (('before', before), ('after', after)):
+        seconds = min(timeit.repeat(func, number=number, repeat=3))
+        print('%-8s %10.2f us/request' % (name, seconds / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+对比批量编辑500行相同子表单时的验证和生成HTML开销：
+    per_form：每行创建一个Form对象（参数名称去掉前缀后放入伪造的请求对象），分别验证和生成HTML
+    formset： FormSet一次提取所有行的参数，按字段逐列验证，使用缓存的HTML模板生成每行
+
+运行方式：python -m benchmarks.bench_formset
+"""
+import timeit
+
+import Tyrion
+from Tyrion import Fields
+from Tyrion import Widget
+from Tyrion.Forms import Form
+from Tyrion.FormSets import FormSet
+from benchmarks.fakes import FakeTornadoHandler
+
+ROW_COUNT = 500
+
+
+class ItemForm(Form):
+    name = Fields.StringField(max_length=32)
+    price = Fields.FloatField(max_value=10000)
+    count = Fields.IntegerField(max_value=100)
+    unit = Fields.IntegerField(widget=Widget.SingleSelect(
+        text_value_list=[{'value': i, 'text': 'unit %s' % i} for i in range(10)]))
+
+
+class ItemFormSet(FormSet):
+    FORM = ItemForm
+    PREFIX = 'items'
+
+
+ARGUMENTS = {'items-TOTAL_FORMS': [str(ROW_COUNT)]}
+for row in range(ROW_COUNT):
+    ARGUMENTS['items-%s-name' % row] = ['item %s' % row]
+    ARGUMENTS['items-%s-price' % row] = ['%s.5' % (row % 50)]
+    ARGUMENTS['items-%s-count' % row] = [str(row % 7)]
+    ARGUMENTS['items-%s-unit' % row] = [str(row % 3)]
+
+
+def per_form(handler):
+    rows = [{} for _ in range(ROW_COUNT)]
+    for k, v in handler.arguments.items():
+        parts = k.split('-', 2)
+        if len(parts) == 3 and parts[1].isdigit():
+            rows[int(parts[1])][parts[2]] = v
+
+    html = []
+    for arguments in rows:
+        form = ItemForm(FakeTornadoHandler(arguments))
+        form.is_valid()
+        html.extend(form.iter_render())
+    return ''.join(html)
+
+
+def formset(handler):
+    items = ItemFormSet(handler)
+    items.is_valid()
+    return str(items)
+
+
+def main(number=5):
+    Tyrion.setup('tornado')
+    handler = FakeTornadoHandler(ARGUMENTS)
+    for func in (per_form, formset):
+        seconds = min(timeit.repeat(lambda: func(handler), number=number, repeat=3))
+        print('%-10s %10.2f ms/%s rows' % (func.__name__, seconds / number * 1e3, ROW_COUNT))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+对比50个字段的Form中，实时验证一个字段（如：输入用户名时）的开销：
+    full：       每次验证整个Form并生成所有字段的HTML
+    incremental：validate_fields只验证和生成该字段，其他字段使用session中保存的上次结果
+
+运行方式：python -m benchmarks.bench_incremental
+"""
+import timeit
+
+import Tyrion
+from Tyrion import Fields
+from Tyrion.Forms import Form
+from benchmarks.fakes import FakeTornadoHandler
+
+FIELD_COUNT = 50
+
+attrs = {}
+for i in range(FIELD_COUNT):
+    attrs['field_%s' % i] = Fields.StringField(max_length=32)
+WideForm = type('WideForm', (Form,), attrs)
+
+ARGUMENTS = dict(('field_%s' % i, ['value %s' % i]) for i in range(FIELD_COUNT))
+
+
+def full(handler):
+    form = WideForm(handler)
+    form.is_valid()
+    return ''.join(form.iter_render())
+
+
+def incremental(handler, state):
+    form = WideForm(handler)
+    return form.validate_fields(['field_0'], state=state, render=True)
+
+
+def main(number=2000):
+    Tyrion.setup('tornado')
+    handler = FakeTornadoHandler(ARGUMENTS)
+    state = {}
+    incremental(handler, state)
+
+    for name, func in (('full', lambda: full(handler)), ('incremental', lambda: incremental(handler, state))):
+        seconds = min(timeit.repeat(func, number=number, repeat=3))
+        print('%-12s %8.2f us/request' % (name, seconds / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
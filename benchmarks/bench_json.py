@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+对比验证JSON请求体的开销：
+    flatten：解析JSON后将所有值转换为字符串，放入伪造的Tornado请求对象中再验证
+    native： Form.from_json直接验证原生类型，整数无需正则验证
+
+运行方式：python -m benchmarks.bench_json
+"""
+import json
+import timeit
+
+import Tyrion
+from Tyrion import Fields
+from Tyrion.Forms import Form
+from Tyrion.Framework import json_text
+from benchmarks.fakes import FakeTornadoHandler
+
+
+class OrderForm(Form):
+    product = Fields.StringField(max_length=32)
+    quantity = Fields.IntegerField(max_value=1000, min_value=1)
+    price = Fields.FloatField()
+    email = Fields.EmailField()
+    tags = Fields.IntegerListField(ele_max_value=100)
+
+
+BODY = json.dumps({
+    'product': 'keyboard',
+    'quantity': 3,
+    'price': 199,
+    'email': 'alex@live.com',
+    'tags': list(range(1, 30)),
+}).encode('utf-8')
+
+
+def flatten():
+    data = json.loads(BODY.decode('utf-8'))
+    arguments = {}
+    for k, v in data.items():
+        values = v if isinstance(v, list) else [v]
+        arguments[k] = [json_text(value) for value in values]
+    OrderForm(FakeTornadoHandler(arguments)).is_valid()
+
+
+def native():
+    OrderForm.from_json(BODY).is_valid()
+
+
+def main(number=5000):
+    Tyrion.setup('tornado')
+    for func in (flatten, native):
+        seconds = min(timeit.repeat(func, number=number, repeat=3))
+        print('%-8s %8.2f us/request' % (func.__name__, seconds / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+使用tracemalloc统计30个字段的Form每个实例分配的内存（仅Python3）：
+    deepcopy：旧版本中每个请求对所有字段及其插件执行copy.deepcopy
+    dict：    每个请求创建带__dict__的BoundField
+    slots：   每个请求创建使用__slots__的BoundField（当前实现）
+
+运行方式：python -m benchmarks.bench_memory
+"""
+import gc
+import tracemalloc
+
+from Tyrion import Fields
+from Tyrion.Forms import Form
+from benchmarks.bench_form_init import WideForm, before
+
+
+class DictBoundField(Fields.BoundField):
+    """
+    带__dict__的BoundField，用于对比
+    """
+
+
+class DictForm(WideForm):
+    def initialize(self):
+        for k, field in self.base_fields:
+            self.FiledDict[k] = DictBoundField(field)
+        self.__dict__.update(self.FiledDict)
+
+
+def measure(factory, count):
+    """
+    创建count个Form实例，返回平均每个实例分配的字节数
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.take_snapshot()
+    forms = [factory() for _ in range(count)]
+    end = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in end.compare_to(start, 'filename'))
+    del forms
+    return allocated / float(count)
+
+
+def main(count=1000):
+    for name, factory in (('deepcopy', before), ('dict', DictForm), ('slots', WideForm)):
+        print('%-10s %10.0f bytes/form' % (name, measure(factory, count)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+多进程并行验证的扩展性：进程数从1增加到CPU核数时的吞吐量
+
+运行方式：python -m benchmarks.bench_parallel
+"""
+import multiprocessing
+import time
+
+from Tyrion import Fields
+from Tyrion.Forms import Form
+
+
+class ImportForm(Form):
+    username = Fields.StringField(max_length=32)
+    email = Fields.EmailField()
+    ip = Fields.IPField()
+    age = Fields.IntegerField(max_value=200)
+    score = Fields.FloatField()
+
+
+def make_records(count):
+    for i in range(count):
+        yield {
+            'username': 'user%s' % i,
+            'email': 'user%s@example.com' % i,
+            'ip': '10.0.%s.%s' % (i % 256, i % 250),
+            'age': str(i % 150),
+            'score': '%s.5' % (i % 100),
+        }
+
+
+def main(count=200000, chunk_size=2000):
+    start = time.time()
+    for _ in ImportForm.iter_validate(make_records(count)):
+        pass
+    print('%-12s %12.0f rows/s' % ('serial', count / (time.time() - start)))
+
+    for workers in range(1, multiprocessing.cpu_count() + 1):
+        start = time.time()
+        for _ in ImportForm.validate_parallel(make_records(count), workers=workers, chunk_size=chunk_size):
+            pass
+        print('%-12s %12.0f rows/s' % ('workers=%s' % workers, count / (time.time() - start)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+对比重复提交相同参数时的Form验证开销（包含一个开销较大的自定义字段）：
+    uncached：每次都验证所有字段
+    cached：  RESULT_CACHE_SIZE大于0，相同的参数直接使用缓存的验证结果
+
+运行方式：python -m benchmarks.bench_result_cache
+"""
+import timeit
+
+import Tyrion
+from Tyrion import Fields
+from Tyrion.Forms import Form
+from benchmarks.fakes import make_request
+
+
+class PasswordField(Fields.StringField):
+    """
+    模拟开销较大的自定义验证，如：密码强度检查
+    """
+
+    def check(self, input_value):
+        for _ in range(200):
+            status, value, error = super(PasswordField, self).check(input_value)
+        return status, value, error
+
+
+class UncachedForm(Form):
+    username = Fields.StringField(max_length=32)
+    email = Fields.EmailField()
+    password = PasswordField(min_length=6)
+    hobby = Fields.IntegerListField(required=False)
+
+
+class CachedForm(UncachedForm):
+    RESULT_CACHE_SIZE = 1024
+
+
+ARGUMENTS = {'username': ['alex'], 'email': ['alex@live.com'], 'password': ['secret'], 'hobby': ['1', '2']}
+
+
+def main(number=2000):
+    Tyrion.setup('tornado')
+    request = make_request('tornado', ARGUMENTS)
+    for form_class in (UncachedForm, CachedForm):
+        seconds = min(timeit.repeat(lambda: form_class(request).is_valid(), number=number, repeat=3))
+        print('%-14s %8.2f us/form' % (form_class.__name__, seconds / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+对比每种Web框架适配器下的Form验证开销：
+    per_field：旧版本中每个字段分别调用 get_argument / get_arguments
+    snapshot： 每个Form一次性从请求中提取参数快照
+
+运行方式：python -m benchmarks.bench_snapshot
+"""
+import timeit
+
+import Tyrion
+from Tyrion import Fields
+from Tyrion.Forms import Form
+from benchmarks.fakes import FAKE_REQUESTS, make_request
+
+FIELD_COUNT = 20
+
+attrs = {}
+for i in range(FIELD_COUNT):
+    attrs['field_%s' % i] = Fields.StringField(max_length=32)
+attrs['hobby'] = Fields.StringListField()
+SnapshotForm = type('SnapshotForm', (Form,), attrs)
+
+QUERY = dict(('field_%s' % i, ['value']) for i in range(0, FIELD_COUNT, 2))
+BODY = dict(('field_%s' % i, ['value']) for i in range(1, FIELD_COUNT, 2))
+BODY['hobby'] = ['1', '2', '3']
+
+
+def per_field(request):
+    form = SnapshotForm(request)
+    for k, v in form.FiledDict.items():
+        v.valid(request)
+        if v.status:
+            form.value_dict[k] = v.value
+        else:
+            form.error_dict[k] = v.error
+            form.valid_status = False
+
+
+def snapshot(request):
+    form = SnapshotForm(request)
+    form.is_valid()
+
+
+def main(number=5000):
+    for framework in sorted(FAKE_REQUESTS):
+        Tyrion.setup(framework)
+        request = make_request(framework, QUERY, BODY)
+        for func in (per_field, snapshot):
+            seconds = min(timeit.repeat(lambda: func(request), number=number, repeat=3))
+            print('%-8s %-10s %8.2f us/form' % (framework, func.__name__, seconds / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
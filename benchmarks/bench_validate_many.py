@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+对比批量验证的吞吐量：
+    per_form：     每条记录创建一个伪请求对象和一个Form实例
+    validate_many：Form.validate_many 共享编译好的字段逐列验证
+
+运行方式：python -m benchmarks.bench_validate_many
+"""
+import time
+
+import Tyrion
+from Tyrion import Fields
+from Tyrion.Forms import Form
+from benchmarks.fakes import FakeTornadoHandler
+
+
+class ImportForm(Form):
+    username = Fields.StringField(max_length=32)
+    age = Fields.IntegerField(max_value=200)
+
+
+def make_records(count):
+    records = []
+    for i in range(count):
+        age = str(i % 150) if i % 10 else 'x'
+        records.append({'username': 'user%s' % i, 'age': age})
+    return records
+
+
+def per_form(records):
+    for record in records:
+        handler = FakeTornadoHandler(dict((k, [v]) for k, v in record.items()))
+        form = ImportForm(handler)
+        form.is_valid()
+
+
+def validate_many(records):
+    ImportForm.validate_many(records)
+
+
+def validate_many_columns(records):
+    ImportForm.validate_many({
+        'username': [record['username'] for record in records],
+        'age': [record['age'] for record in records],
+    })
+
+
+def main(count=200000):
+    Tyrion.setup('tornado')
+    records = make_records(count)
+    for func in (per_form, validate_many, validate_many_columns):
+        start = time.time()
+        func(records)
+        seconds = time.time() - start
+        print('%-22s %12.0f rows/s' % (func.__name__, count / seconds))
+
+
+if __name__ == '__main__':
+    main()
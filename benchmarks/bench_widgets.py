@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+对比1000个选项的CheckBox组的生成速度：
+    legacy：旧版本中每个选项都重新拼接一次全部HTML属性
+    cached：属性字符串缓存在插件中，每个选项只格式化value和内容
+
+对比开启HTML片段缓存前后，1000个选项的CheckBox字段的生成速度
+
+对比20000个选项、500个选中值的MultiSelect的生成速度：
+    legacy：旧版本中每个选项在选中值列表中线性查找
+    indexed：选中值在设置时生成哈希索引
+
+运行方式：python -m benchmarks.bench_widgets
+"""
+import timeit
+
+from Tyrion import Cache
+from Tyrion import Fields
+from Tyrion import Widget
+
+OPTION_COUNT = 1000
+ATTR = {'name': 'category', 'class': 'form-check-input', 'data-toggle': 'category', 'data-group': 'main'}
+CHOICES = [{'value': i, 'text': 'category %s' % i} for i in range(OPTION_COUNT)]
+CHECKED = list(range(0, OPTION_COUNT, 10))
+
+
+def legacy_render(widget):
+    """
+    旧版本InputMultiCheckBox.__str__的实现
+    """
+    tag_list = []
+    for item in widget.text_value_list:
+        a = "<div><span>%s</span><span>%s</span></div>"
+        b = "<input %s />"
+        attr_list = []
+        for k, v in widget.attr.items():
+            temp = "%s='%s' " % (k, v,)
+            attr_list.append(temp)
+        attr_list.append("%s='%s' " % ('value', item['value']))
+        if item['value'] in widget.checked_value_list:
+            attr_list.append("checked='checked' ")
+        input_tag = b % (''.join(attr_list))
+        c = a % (input_tag, item['text'], )
+        tag_list.append(c)
+    return ''.join(tag_list)
+
+
+LARGE_CHOICES = [{'value': i, 'text': 'category %s' % i} for i in range(20000)]
+LARGE_SELECTED = list(range(0, 20000, 40))
+
+
+def legacy_select_render(widget):
+    """
+    旧版本MultiSelect.__str__的实现
+    """
+    a = "<select %s>%s</select>"
+    attr_list = []
+    for k, v in widget.attr.items():
+        temp = "%s='%s' " % (k, v,)
+        attr_list.append(temp)
+    option_list = []
+    for item in widget.text_value_list:
+        if item['value'] in widget.selected_value_list:
+            b = "<option selected='selected' value='%s'>%s</option>"
+        else:
+            b = "<option value='%s'>%s</option>"
+        option = b % (item['value'], item['text'],)
+        option_list.append(option)
+    return a % (''.join(attr_list), ''.join(option_list))
+
+
+def main(number=100):
+    widget = Widget.InputMultiCheckBox(ATTR, CHOICES, CHECKED)
+    assert legacy_render(widget) == str(widget)
+    for name, func in (('legacy', lambda: legacy_render(widget)), ('cached', lambda: str(widget))):
+        seconds = min(timeit.repeat(func, number=number, repeat=3))
+        print('checkbox x1000  %-8s %10.0f renders/s' % (name, number / seconds))
+
+    field = Fields.IntegerListField(widget=Widget.InputMultiCheckBox(ATTR, CHOICES))
+    for maxsize in (0, 128):
+        Cache.fragment_cache.resize(maxsize)
+        seconds = min(timeit.repeat(lambda: field.render(CHECKED), number=number, repeat=3))
+        print('field x1000     %-8s %10.0f renders/s' % ('cache=%s' % maxsize, number / seconds))
+    Cache.fragment_cache.resize(0)
+
+    widget = Widget.MultiSelect(ATTR, LARGE_CHOICES, LARGE_SELECTED)
+    assert legacy_select_render(widget) == str(widget)
+    for name, func in (('legacy', lambda: legacy_select_render(widget)), ('indexed', lambda: str(widget))):
+        seconds = min(timeit.repeat(func, number=3, repeat=3))
+        print('select x20000   %-8s %10.1f renders/s' % (name, 3 / seconds))
+
+
+if __name__ == '__main__':
+    main()
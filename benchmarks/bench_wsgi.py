@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+使用wsgiref构造请求，对比纯WSGI应用中的Form验证开销：
+    parse_qs：先用urllib完整解析query string和请求体（包括Form中未声明的参数），再交给Tyrion
+    wsgi：    Tyrion的WSGI适配器只解析Form中声明的参数
+
+运行方式：python -m benchmarks.bench_wsgi
+"""
+import io
+import timeit
+from wsgiref.util import setup_testing_defaults
+
+try:
+    from urllib.parse import parse_qs, urlencode
+except ImportError:
+    from urlparse import parse_qs
+    from urllib import urlencode
+
+import Tyrion
+from Tyrion import Fields
+from Tyrion.Forms import Form
+from benchmarks.fakes import FakeTornadoHandler
+
+
+class LoginForm(Form):
+    username = Fields.StringField(max_length=32)
+    password = Fields.StringField(min_length=6)
+    hobby = Fields.IntegerListField(required=False)
+
+
+QUERY = urlencode([('next', '/home/%s' % i) for i in range(20)] + [('hobby', '1'), ('hobby', '2')])
+BODY = urlencode([('username', '武沛齐'), ('password', 'secret+password')] +
+                 [('extra_%s' % i, 'ignored value %s' % i) for i in range(40)]).encode('latin-1')
+
+
+def make_environ():
+    environ = {
+        'REQUEST_METHOD': 'POST',
+        'QUERY_STRING': QUERY,
+        'CONTENT_TYPE': 'application/x-www-form-urlencoded',
+        'CONTENT_LENGTH': str(len(BODY)),
+        'wsgi.input': io.BytesIO(BODY),
+    }
+    setup_testing_defaults(environ)
+    return environ
+
+
+def parse_qs_app(environ, start_response):
+    body = environ['wsgi.input'].read(int(environ['CONTENT_LENGTH']))
+    arguments = parse_qs(environ['QUERY_STRING'], keep_blank_values=True)
+    for k, v in parse_qs(body.decode('latin-1'), keep_blank_values=True).items():
+        arguments.setdefault(k, []).extend(v)
+    form = LoginForm(FakeTornadoHandler(arguments))
+    status = form.is_valid()
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [str(status).encode()]
+
+
+def wsgi_app(environ, start_response):
+    form = LoginForm(environ)
+    status = form.is_valid()
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [str(status).encode()]
+
+
+def start_response(status, headers):
+    pass
+
+
+def main(number=5000):
+    for framework, app in (('tornado', parse_qs_app), ('wsgi', wsgi_app)):
+        Tyrion.setup(framework)
+        seconds = min(timeit.repeat(lambda: app(make_environ(), start_response), number=number, repeat=3))
+        print('%-12s %8.2f us/request' % (app.__name__, seconds / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
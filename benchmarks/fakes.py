@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+基准测试使用的轻量级伪请求对象，无需安装任何Web框架
+参数均使用字典表示，如：{'username': ['alex'], 'hobby': ['1', '2']}
+"""
+
+
+class FakeTornadoHandler(object):
+    """
+    模拟Tornado中的XXXHandler对象
+    """
+
+    def __init__(self, arguments=None, query_arguments=None, body_arguments=None):
+        """
+        :param arguments: GET和POST参数，未指定时由query_arguments和body_arguments合并而成
+        :param query_arguments: GET参数
+        :param body_arguments: POST参数
+        :return:
+        """
+        self.query_arguments = query_arguments if query_arguments else {}
+        self.body_arguments = body_arguments if body_arguments else {}
+        if arguments is None:
+            arguments = {}
+            for params in (self.query_arguments, self.body_arguments):
+                for k, v in params.items():
+                    arguments.setdefault(k, []).extend(v)
+        self.arguments = arguments
+
+    @staticmethod
+    def _get_argument(arguments, name, default):
+        value = arguments.get(name)
+        if not value:
+            return default
+        return value[-1].strip()
+
+    @staticmethod
+    def _get_arguments(arguments, name):
+        return [v.strip() for v in arguments.get(name, [])]
+
+    def get_argument(self, name, default=None):
+        return self._get_argument(self.arguments, name, default)
+
+    def get_arguments(self, name):
+        return self._get_arguments(self.arguments, name)
+
+    def get_query_argument(self, name, default=None):
+        return self._get_argument(self.query_arguments, name, default)
+
+    def get_query_arguments(self, name):
+        return self._get_arguments(self.query_arguments, name)
+
+    def get_body_argument(self, name, default=None):
+        return self._get_argument(self.body_arguments, name, default)
+
+    def get_body_arguments(self, name):
+        return self._get_arguments(self.body_arguments, name)
+
+
+class FakeMultiDict(object):
+    """
+    模拟Django的QueryDict、Flask的MultiDict、Bottle的FormsDict
+    """
+
+    def __init__(self, arguments=None, first=False):
+        """
+        :param arguments: 参数字典
+        :param first: get方法返回第一个值（Flask）还是最后一个值（Django、Bottle）
+        :return:
+        """
+        self.arguments = arguments if arguments else {}
+        self.first = first
+
+    def get(self, name, default=None):
+        value = self.arguments.get(name)
+        if not value:
+            return default
+        return value[0] if self.first else value[-1]
+
+    def getlist(self, name):
+        return list(self.arguments.get(name, []))
+
+    getall = getlist
+
+
+class FakeDjangoRequest(object):
+    def __init__(self, query_arguments=None, body_arguments=None):
+        self.GET = FakeMultiDict(query_arguments)
+        self.POST = FakeMultiDict(body_arguments)
+
+
+class FakeFlaskRequest(object):
+    def __init__(self, query_arguments=None, body_arguments=None):
+        self.args = FakeMultiDict(query_arguments, first=True)
+        self.form = FakeMultiDict(body_arguments, first=True)
+
+    @property
+    def values(self):
+        # 与Flask一致，每次访问都重新合并GET和POST参数
+        arguments = {}
+        for params in (self.args.arguments, self.form.arguments):
+            for k, v in params.items():
+                arguments.setdefault(k, []).extend(v)
+        return FakeMultiDict(arguments, first=True)
+
+
+class FakeBottleRequest(object):
+    def __init__(self, query_arguments=None, body_arguments=None):
+        self.query = FakeMultiDict(query_arguments)
+        self.forms = FakeMultiDict(body_arguments)
+        arguments = {}
+        for params in (query_arguments or {}, body_arguments or {}):
+            for k, v in params.items():
+                arguments.setdefault(k, []).extend(v)
+        self.params = FakeMultiDict(arguments)
+
+
+FAKE_REQUESTS = {
+    'tornado': FakeTornadoHandler,
+    'django': FakeDjangoRequest,
+    'flask': FakeFlaskRequest,
+    'bottle': FakeBottleRequest,
+}
+
+
+def make_request(framework, query_arguments=None, body_arguments=None):
+    """
+    创建指定Web框架的伪请求对象
+    :param framework: Web框架的字符串表示，与Tyrion.setup的参数一致
+    :return:
+    """
+    cls = FAKE_REQUESTS[framework]
+    if cls is FakeTornadoHandler:
+        return cls(query_arguments=query_arguments, body_arguments=body_arguments)
+    return cls(query_arguments, body_arguments)
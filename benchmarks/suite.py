@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""
+基准测试套件，覆盖字段验证、插件生成、Form初始化和验证以及各Web框架适配器，无需安装任何Web框架
+
+运行并将结果保存为JSON：
+    python -m benchmarks.suite run -o before.json
+    python -m benchmarks.suite run -o after.json -k widget.
+对比两次运行的结果，耗时增加超过阈值（默认10%）的用例标记为REGRESSION，存在时退出码为1：
+    python -m benchmarks.suite compare before.json after.json --threshold 0.1
+"""
+import argparse
+import copy
+import json
+import platform
+import sys
+import time
+import timeit
+
+try:
+    from urllib.parse import urlencode
+except ImportError:
+    from urllib import urlencode
+
+import Tyrion
+from Tyrion import Fields
+from Tyrion import Widget
+from Tyrion.Forms import Form
+from benchmarks.fakes import FAKE_REQUESTS, FakeTornadoHandler, make_request
+
+# 每组计时的最短时间（秒）
+MIN_TIME = 0.05
+REPEAT = 5
+
+SMALL_CHOICES = [{'value': i, 'text': 'option %s' % i} for i in range(10)]
+LARGE_CHOICES = [{'value': i, 'text': 'option %s' % i} for i in range(1000)]
+FORM_SIZES = (5, 20, 100)
+
+# (字段, 合法的输入, 非法的输入)
+FIELD_CASES = (
+    (Fields.StringField(max_length=32), 'alex', 'a' * 40),
+    (Fields.EmailField(), 'alex@live.com', 'alex'),
+    (Fields.IPField(), '192.168.1.1', '300.1.1'),
+    (Fields.IntegerField(max_value=1000), '42', '4x'),
+    (Fields.FloatField(max_value=1000), '3.14', 'pi'),
+    (Fields.StringListField(ele_max_length=32), ['a', 'b', 'c'], ['a', 'b' * 40]),
+    (Fields.IntegerListField(), ['1', '2', '3'], ['1', 'x']),
+)
+
+
+def field_cases():
+    cases = []
+    for field, valid_value, invalid_value in FIELD_CASES:
+        field = copy.deepcopy(field)
+        field.name = 'value'
+        for label, input_value in (('valid', valid_value), ('invalid', invalid_value)):
+            values = input_value if isinstance(input_value, list) else [input_value]
+            handler = FakeTornadoHandler({'value': values})
+            cases.append(('field.%s.%s' % (field.__class__.__name__, label),
+                          lambda field=field, handler=handler: field.valid(handler)))
+    return cases
+
+
+def widget_cases():
+    cases = [
+        ('widget.InputText', Widget.InputText(), 'alex'),
+        ('widget.InputEmail', Widget.InputEmail(), 'alex@live.com'),
+        ('widget.InputPassword', Widget.InputPassword(), 'secret'),
+        ('widget.InputSingleCheckBox', Widget.InputSingleCheckBox(), True),
+        ('widget.TextArea', Widget.TextArea(), 'text ' * 20),
+    ]
+    for label, choices in (('small', SMALL_CHOICES), ('large', LARGE_CHOICES)):
+        values = [item['value'] for item in choices[::3]]
+        cases.extend([
+            ('widget.InputMultiCheckBox.%s' % label, Widget.InputMultiCheckBox(text_value_list=choices), values),
+            ('widget.InputRadio.%s' % label, Widget.InputRadio(text_value_list=choices), values[-1]),
+            ('widget.SingleSelect.%s' % label, Widget.SingleSelect(text_value_list=choices), values[-1]),
+            ('widget.MultiSelect.%s' % label, Widget.MultiSelect(text_value_list=choices), values),
+        ])
+    return [(name, lambda widget=widget, value=value: widget.render(value)) for name, widget, value in cases]
+
+
+def make_form(size):
+    attrs = {}
+    for i in range(size):
+        if i % 3 == 0:
+            attrs['field_%s' % i] = Fields.StringField(max_length=32)
+        elif i % 3 == 1:
+            attrs['field_%s' % i] = Fields.IntegerField(max_value=1000)
+        else:
+            attrs['field_%s' % i] = Fields.EmailField()
+    return type('Form%s' % size, (Form,), attrs)
+
+
+def make_arguments(size):
+    arguments = {}
+    for i in range(size):
+        arguments['field_%s' % i] = [('alex', '42', 'alex@live.com')[i % 3]]
+    return arguments
+
+
+def form_cases():
+    cases = []
+    for size in FORM_SIZES:
+        form_class = make_form(size)
+        handler = FakeTornadoHandler(make_arguments(size))
+        cases.append(('form.init.%s' % size, lambda form_class=form_class: form_class()))
+        cases.append(('form.is_valid.%s' % size,
+                      lambda form_class=form_class, handler=handler: form_class(handler).is_valid()))
+    return cases
+
+
+def framework_cases():
+    size = 20
+    form_class = make_form(size)
+    arguments = make_arguments(size)
+    query = dict((k, v) for k, v in arguments.items() if int(k.split('_')[1]) % 2 == 0)
+    body = dict((k, v) for k, v in arguments.items() if k not in query)
+
+    requests = [(framework, make_request(framework, query, body)) for framework in sorted(FAKE_REQUESTS)]
+    requests.append(('wsgi', urlencode([(k, v[0]) for k, v in sorted(arguments.items())]).encode('latin-1')))
+    return [('framework.%s' % framework, framework, lambda request=request: form_class(request).is_valid())
+            for framework, request in requests]
+
+
+def collect_cases():
+    """
+    :return: [(名称, Web框架, 函数), ...]
+    """
+    cases = [(name, 'tornado', func) for name, func in field_cases() + widget_cases() + form_cases()]
+    return cases + framework_cases()
+
+
+def measure(func):
+    """
+    自动确定执行次数，使每组计时不少于MIN_TIME
+    :return: {'number': 每组执行次数, 'best_us': 最快一组的单次耗时, 'median_us': 中位数}
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        if timer.timeit(number) >= MIN_TIME:
+            break
+        number *= 2
+    timings = sorted(t / number * 1e6 for t in timer.repeat(repeat=REPEAT, number=number))
+    return {'number': number, 'best_us': timings[0], 'median_us': timings[len(timings) // 2]}
+
+
+def run(output=None, keyword=None):
+    results = {}
+    for name, framework, func in collect_cases():
+        if keyword and keyword not in name:
+            continue
+        Tyrion.setup(framework)
+        results[name] = measure(func)
+        print('%-40s %12.2f us' % (name, results[name]['best_us']))
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'results': results,
+    }
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    return report
+
+
+def compare(before_file, after_file, threshold=0.1):
+    """
+    对比两次运行的结果（使用最快一组的耗时）
+    :return: 存在性能下降的用例时返回1，否则返回0
+    """
+    with open(before_file) as f:
+        before = json.load(f)['results']
+    with open(after_file) as f:
+        after = json.load(f)['results']
+
+    regressions = 0
+    print('%-40s %12s %12s %8s' % ('case', 'before(us)', 'after(us)', 'change'))
+    for name in sorted(set(before) & set(after)):
+        old, new = before[name]['best_us'], after[name]['best_us']
+        change = new / old - 1 if old else 0.0
+        flag = ''
+        if change > threshold:
+            flag = 'REGRESSION'
+            regressions += 1
+        elif change < -threshold:
+            flag = 'faster'
+        print('%-40s %12.2f %12.2f %+7.1f%% %s' % (name, old, new, change * 100, flag))
+    for name in sorted(set(before) ^ set(after)):
+        print('%-40s only in %s' % (name, before_file if name in before else after_file))
+
+    print('%s regression(s), threshold %.0f%%' % (regressions, threshold * 100))
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Tyrion benchmark suite')
+    subparsers = parser.add_subparsers(dest='command')
+
+    run_parser = subparsers.add_parser('run', help='run benchmarks')
+    run_parser.add_argument('-o', '--output', help='write results to a JSON file')
+    run_parser.add_argument('-k', '--keyword', help='only run cases whose name contains KEYWORD')
+
+    compare_parser = subparsers.add_parser('compare', help='compare two JSON results')
+    compare_parser.add_argument('before')
+    compare_parser.add_argument('after')
+    compare_parser.add_argument('--threshold', type=float, default=0.1,
+                                help='relative slowdown reported as a regression (default: 0.1)')
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 2
+    if args.command == 'compare':
+        return compare(args.before, args.after, args.threshold)
+    run(args.output, args.keyword)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -85,6 +85,6 @@ setup(
 
     keywords='web form python tornado django bottle flask',
 
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*', 'tests', 'tests.*']),
 
 )
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+import asyncio
+import time
+
+import pytest
+
+from Tyrion import Fields
+from Tyrion.Async import AsyncValidator
+from Tyrion.Forms import Form
+
+
+class FakeDB(object):
+    """
+    内存中的数据库替身，每次查询耗时delay秒
+    """
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.users = {'alex'}
+        self.coupons = {'SAVE10'}
+        self.calls = []
+        self.cancelled = []
+
+    async def exists(self, table, value):
+        self.calls.append((table, value))
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled.append((table, value))
+            raise
+        return value in getattr(self, table)
+
+
+def make_form(db, timeout=None, broken=False):
+    async def username_not_taken(value):
+        if await db.exists('users', value):
+            return 'username taken'
+
+    async def coupon_valid(value):
+        if broken:
+            raise ConnectionError('db down')
+        if not await db.exists('coupons', value):
+            return 'coupon invalid'
+
+    async def slow_check(value):
+        await db.exists('users', value + '-slow')
+
+    class RegisterForm(Form):
+        username = Fields.StringField(async_validators=[username_not_taken])
+        coupon = Fields.StringField(async_validators=[coupon_valid])
+        nickname = Fields.StringField(required=False,
+                                      async_validators=[AsyncValidator(slow_check, timeout=timeout,
+                                                                       timeout_error='nickname timed out')])
+
+    return RegisterForm
+
+
+def run(form, fail_fast=True):
+    return asyncio.run(form.is_valid_async(fail_fast))
+
+
+def test_validators_run_concurrently():
+    db = FakeDB(delay=0.1)
+    form = make_form(db).from_json({'username': 'eric', 'coupon': 'SAVE10', 'nickname': 'e'})
+    start = time.time()
+    assert run(form)
+    assert time.time() - start < 0.25
+    assert len(db.calls) == 3
+    assert form.value_dict == {'username': 'eric', 'coupon': 'SAVE10', 'nickname': 'e'}
+
+
+def test_validator_timeout():
+    db = FakeDB(delay=0.2)
+    form = make_form(db, timeout=0.01).from_json({'username': 'eric', 'coupon': 'SAVE10', 'nickname': 'e'})
+    assert not run(form, fail_fast=False)
+    assert form.error_dict == {'nickname': 'nickname timed out'}
+
+
+def test_fail_fast_cancels_pending():
+    db = FakeDB(delay=0.01)
+    form = make_form(db, timeout=5).from_json({'username': 'alex', 'coupon': 'SAVE10', 'nickname': 'e'})
+
+    original = db.exists
+
+    async def exists(table, value):
+        if value.endswith('-slow') or table == 'coupons':
+            db.delay = 1
+        else:
+            db.delay = 0.01
+        return await original(table, value)
+
+    db.exists = exists
+    start = time.time()
+    assert not run(form)
+    assert time.time() - start < 0.5
+    assert form.error_dict == {'username': 'username taken'}
+    assert sorted(db.cancelled) == [('coupons', 'SAVE10'), ('users', 'e-slow')]
+
+
+def test_exception_propagates_after_cancelling():
+    db = FakeDB(delay=0.2)
+    form = make_form(db, broken=True).from_json({'username': 'eric', 'coupon': 'SAVE10', 'nickname': 'e'})
+    with pytest.raises(ConnectionError):
+        run(form)
+    assert sorted(db.cancelled) == [('users', 'e-slow'), ('users', 'eric')]
+    assert form.error_dict == {}
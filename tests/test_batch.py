@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+from Tyrion import Fields
+from Tyrion.Forms import Form
+
+
+class RecordForm(Form):
+    age = Fields.IntegerField(max_value=150)
+    price = Fields.FloatField(required=False)
+    tags = Fields.IntegerListField(required=False)
+    name = Fields.StringField(required=False)
+
+
+def test_validate_many_native_values():
+    results = RecordForm.validate_many([
+        {'age': 30, 'price': 1.5, 'tags': (1, 2), 'name': 5},
+        {'age': 200, 'price': 1.234},
+        {'age': True},
+    ])
+    assert results[0] == ({'age': 30, 'price': 1.5, 'tags': [1, 2], 'name': '5'}, {})
+    assert results[1][1] == {'age': 'age max value is 150', 'price': 'price is invalid'}
+    assert results[2][1] == {'age': 'age is invalid'}
+
+
+def test_validate_many_columns_native_values():
+    results = RecordForm.validate_many({'age': [30, '31'], 'tags': [[1], ['2', 3]]})
+    assert [value_dict['age'] for value_dict, _ in results] == [30, 31]
+    assert [value_dict['tags'] for value_dict, _ in results] == [[1], [2, 3]]
+
+
+def test_validate_many_matches_strings():
+    native = RecordForm.validate_many([{'age': 30, 'price': 2}])
+    text = RecordForm.validate_many([{'age': '30', 'price': '2'}])
+    assert native == text
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+from Tyrion.Choices import ChoiceProvider
+
+
+def test_source_version_checks_are_throttled():
+    calls = []
+
+    def source_version():
+        calls.append(1)
+        return 1
+
+    provider = ChoiceProvider(lambda: [(1, 'a')], source_version=source_version, version_interval=60)
+    for _ in range(100):
+        provider.columns()
+        provider.key_index()
+    assert len(calls) == 1
+
+    provider.version_interval = 0
+    provider.columns()
+    assert len(calls) == 2
+
+
+def test_float_field_matches_integer_choices():
+    from Tyrion import Fields
+    from Tyrion import Widget
+    from Tyrion.Forms import Form
+
+    class PriceForm(Form):
+        price = Fields.FloatField(choices_only=True,
+                                  widget=Widget.SingleSelect(text_value_list=[{'value': 1, 'text': 'one'},
+                                                                              {'value': 2.5, 'text': 'two'}]))
+
+    for payload in ({'price': '1'}, {'price': '1.0'}, {'price': 1}, {'price': 2.5}):
+        form = PriceForm.from_json(payload)
+        assert form.is_valid(), payload
+    assert not PriceForm.from_json({'price': '3'}).is_valid()
+    form = PriceForm.from_json({'price': '1.0'})
+    form.is_valid()
+    assert "<option selected='selected' value='1'>one</option>" in str(form.price)
+
+
+def test_refresh_is_atomic_for_readers():
+    import threading
+
+    provider = ChoiceProvider(choices=[(0, 't0')])
+    stop = []
+    errors = []
+
+    def writer():
+        generation = 0
+        while not stop:
+            generation += 1
+            provider.set_choices([(generation, 't%s' % generation)] * 20)
+
+    def reader():
+        for _ in range(20000):
+            values, texts, keys = provider.columns()
+            if texts[0] != 't%s' % values[0] or keys[0] != str(values[0]):
+                errors.append((values[0], texts[0], keys[0]))
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        reader()
+    finally:
+        stop.append(True)
+        thread.join()
+    assert errors == []
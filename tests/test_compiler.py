@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+from benchmarks.fakes import make_request
+from Tyrion import Fields
+from Tyrion import create_framework
+from Tyrion.Forms import Form
+
+
+class EvenField(Fields.IntegerField):
+    def check_value(self, value):
+        if value % 2:
+            return False, value, 'odd'
+        return True, value, None
+
+
+class SignedField(Fields.IntegerField):
+    REGULAR = "^-?\\d+$"
+
+
+class OrderForm(Form):
+    COMPILE = True
+    count = EvenField()
+    delta = SignedField(required=False)
+    name = Fields.StringField(required=False)
+
+
+def validate(arguments):
+    form = OrderForm(make_request('tornado', arguments), framework=create_framework('tornado'))
+    return form.is_valid(), form.value_dict, form.error_dict
+
+
+def test_overridden_helpers_are_not_inlined():
+    source = OrderForm.compiled_source
+    assert source.count('status, value, error = check_') == 2
+    assert 'elif not matcher_' in source
+
+    assert validate({'count': ['3']})[2] == {'count': 'odd'}
+    assert validate({'count': ['4'], 'delta': ['-2'], 'name': ['x']}) == \
+        (True, {'count': 4, 'delta': -2, 'name': 'x'}, {})
+
+
+class LoginForm(Form):
+    COMPILE = True
+    username = Fields.StringField(max_length=3)
+
+
+def test_private_config_is_not_compiled_away():
+    form = LoginForm(make_request('tornado', {'username': ['alex']}), framework=create_framework('tornado'))
+    form.username.custom_error_dict['max_length'] = 'too long!'
+    assert not form.is_valid()
+    assert form.error_dict == {'username': 'too long!'}
+
+    form = LoginForm(make_request('tornado', {'username': ['alex']}), framework=create_framework('tornado'))
+    assert not form.is_valid()
+    assert form.error_dict == {'username': 'username max length is 3'}
+
+
+class PlainForm(Form):
+    COMPILE = True
+    name = Fields.StringField(max_length=3)
+    age = Fields.IntegerField()
+    tags = Fields.IntegerListField(required=False)
+
+
+def test_builtin_fields_are_inlined():
+    assert "check_" not in PlainForm.compiled_source
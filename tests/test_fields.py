@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+from benchmarks.fakes import FakeTornadoHandler
+from Tyrion import Fields
+from Tyrion import Widget
+from Tyrion import create_framework
+from Tyrion.Forms import Form
+
+
+class UpperField(Fields.Field):
+    """
+    只重写了valid的自定义字段（旧的扩展方式）
+    """
+
+    def __init__(self):
+        super(UpperField, self).__init__(Widget.InputText())
+
+    def valid(self, handler):
+        value = handler.get_argument(self.name, None)
+        if value:
+            self.status, self.value, self.error = True, value.upper(), None
+        else:
+            self.status, self.value, self.error = False, None, '%s is required' % self.name
+
+
+def make_form(**options):
+    attrs = dict(options, code=UpperField(), name=Fields.StringField())
+    return type('LegacyForm', (Form,), attrs)
+
+
+def validate(form_class, arguments):
+    form = form_class(FakeTornadoHandler(arguments), framework=create_framework('tornado'))
+    return form.is_valid(), form.value_dict, form.error_dict
+
+
+def test_legacy_valid_field():
+    for options in ({}, {'COMPILE': True}, {'RESULT_CACHE_SIZE': 8}):
+        form_class = make_form(**options)
+        assert validate(form_class, {'code': ['abc'], 'name': ['x']}) == (True, {'code': 'ABC', 'name': 'x'}, {})
+        assert validate(form_class, {'code': ['def'], 'name': ['x']})[1]['code'] == 'DEF'
+        assert validate(form_class, {'name': ['x']}) == (False, {'name': 'x'}, {'code': 'code is required'})
+        # 共享的字段没有被请求修改
+        field = dict(form_class.base_fields)['code']
+        assert field.value is None and field.error is None
+
+
+def test_legacy_valid_bound_field():
+    form = make_form()(FakeTornadoHandler({'code': ['abc']}), framework=create_framework('tornado'))
+    form.code.valid(form.handler)
+    assert (form.code.status, form.code.value) == (True, 'ABC')
+    assert form.validate_fields(['code']) == {}
+
+
+class LowerField(Fields.StringField):
+    def get_input(self, handler, framework=None):
+        value = super(LowerField, self).get_input(handler, framework)
+        return value.lower() if value else value
+
+
+class LowerForm(Form):
+    COMPILE = True
+    code = LowerField()
+    tags = Fields.StringListField(required=False)
+
+
+def test_get_input_override():
+    assert LowerField.custom_input and not Fields.StringListField.custom_input
+    form = LowerForm(FakeTornadoHandler({'code': ['ABC'], 'tags': ['A']}), framework=create_framework('tornado'))
+    assert form.is_valid()
+    assert form.value_dict == {'code': 'abc', 'tags': ['A']}
+    assert form.validate_fields(['code']) == {} and form.code.value == 'abc'
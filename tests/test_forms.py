@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+import pytest
+
+from Tyrion import Fields
+from Tyrion.Forms import Form
+
+
+class ProjectForm(Form):
+    name = Fields.StringField()
+    framework = Fields.StringField(required=False)
+
+
+def test_field_named_framework():
+    form = ProjectForm.from_json({'name': 'tyrion', 'framework': 'tornado'})
+    assert isinstance(form.framework, Fields.BoundField)
+    assert form.is_valid()
+    assert form.value_dict == {'name': 'tyrion', 'framework': 'tornado'}
+    assert form.validate_fields(['framework']) == {}
+
+
+def test_from_json_rejects_malformed_payload():
+    for payload in (b'{"name": ', '[1, 2]', b'\xff', '"tyrion"'):
+        with pytest.raises(ValueError):
+            ProjectForm.from_json(payload)
+    form = ProjectForm.from_json(b'{"name": "tyrion"}')
+    assert form.is_valid()
+    assert not ProjectForm.from_json(b'  ').is_valid()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+from benchmarks.fakes import FakeTornadoHandler
+from Tyrion import Fields
+from Tyrion import Widget
+from Tyrion import create_framework
+from Tyrion.Choices import ChoiceProvider
+from Tyrion.Forms import Form
+from Tyrion.FormSets import FormSet
+
+units = ChoiceProvider(choices=[(1, 'box')])
+
+
+class ItemForm(Form):
+    name = Fields.StringField()
+    unit = Fields.IntegerField(widget=Widget.SingleSelect(text_value_list=units))
+
+
+class ItemFormSet(FormSet):
+    FORM = ItemForm
+    PREFIX = 'items'
+    MAX_ROWS = 3
+
+
+def test_only_name_attribute_is_substituted():
+    formset = ItemFormSet(total=2)
+    formset.init_rows_value([{'name': "name='items-__prefix__-x", 'unit': 1}, {'name': 'items-__prefix__-name'}])
+    html = str(formset)
+    assert "name='items-0-name' value='name='items-__prefix__-x'" in html
+    assert "name='items-1-name' value='items-__prefix__-name'" in html
+    assert "name='items-0-unit'" in html and "name='items-1-unit'" in html
+
+
+def test_render_cache_follows_choices():
+    formset = ItemFormSet(total=1)
+    formset.init_rows_value([{'unit': 1}])
+    assert '>box<' in str(formset)
+    units.set_choices([(1, 'crate')])
+    html = str(formset)
+    assert '>crate<' in html and '>box<' not in html
+
+
+def test_max_rows_exceeded():
+    formset = ItemFormSet(total=5)
+    assert formset.total == 3
+    assert formset.error == 'items-TOTAL_FORMS max value is 3'
+    assert not formset.valid_status
+    assert ItemFormSet(total=3).error is None
+
+
+def test_init_rows_value_resizes_rows():
+    formset = ItemFormSet(FakeTornadoHandler({}), total=1, framework=create_framework('tornado'))
+    formset.init_rows_value([{'name': 'a', 'unit': 1}, {}, {}])
+    assert len(formset.value_list) == len(formset.error_list) == len(formset.display_list) == 3
+    assert not formset.is_valid()
+    assert len([errors for errors in formset.error_list if errors]) == 3
+
+    formset = ItemFormSet(total=1)
+    formset.init_rows_value([{}] * 5)
+    assert formset.total == len(formset.error_list) == len(formset.display_list) == 3
+    assert formset.error == 'items-TOTAL_FORMS max value is 3'
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+import json
+
+from benchmarks.fakes import make_request
+from Tyrion import Fields
+from Tyrion import Widget
+from Tyrion import create_framework
+from Tyrion.Forms import Form
+
+calls = []
+
+
+class CountingField(Fields.StringField):
+    def check(self, input_value):
+        calls.append(input_value)
+        return super(CountingField, self).check(input_value)
+
+
+class SignupForm(Form):
+    username = CountingField(min_length=3)
+    email = Fields.EmailField()
+    hobby = Fields.IntegerListField(required=False, widget=Widget.MultiSelect(
+        text_value_list=[{'value': 1, 'text': 'a'}, {'value': 2, 'text': 'b'}]))
+
+
+def make_form(arguments):
+    return SignupForm(make_request('tornado', arguments), framework=create_framework('tornado'))
+
+
+def test_partial_validation_is_not_valid():
+    form = make_form({'username': ['alex'], 'email': ['a@b.cn']})
+    assert form.validate_fields(['username']) == {}
+    assert not form.valid_status
+    assert form.validate_fields(['email', 'hobby']) == {}
+    assert form.valid_status
+
+    form = make_form({'username': ['al']})
+    assert form.validate_fields(['username']) == {'username': 'username min length is 3'}
+    assert not form.valid_status
+
+
+def test_state_reuses_unchanged_results():
+    del calls[:]
+    state = {}
+    errors, fragments = make_form({'username': ['al']}).validate_fields(['username'], state=state, render=True)
+    assert errors == {'username': 'username min length is 3'}
+    assert "name='username'" in fragments['username']
+    assert calls == ['al']
+
+    # state可以序列化保存在session中
+    state = json.loads(json.dumps(state))
+    form = make_form({'username': ['al']})
+    errors, fragments = form.validate_fields(['username'], state=state, render=True)
+    assert errors == {'username': 'username min length is 3'}
+    assert fragments == {}
+    assert calls == ['al']
+    assert form.error_dict == {'username': 'username min length is 3'}
+
+    form = make_form({'username': ['alex']})
+    errors, fragments = form.validate_fields(['username'], state=state, render=True)
+    assert errors == {}
+    assert "value='alex'" in fragments['username']
+    assert calls == ['al', 'alex']
+    assert form.value_dict == {'username': 'alex'}
+
+
+def test_changed_fragments_only():
+    state = {}
+    make_form({'hobby': ['1']}).validate_fields(['hobby'], state=state, render=True)
+    # 输入变化但生成的HTML相同时不返回片段
+    _, fragments = make_form({'hobby': ['1', '1']}).validate_fields(['hobby'], state=state, render=True)
+    assert fragments == {}
+    _, fragments = make_form({'hobby': ['2']}).validate_fields(['hobby'], state=state, render=True)
+    assert "selected='selected' value='2'" in fragments['hobby']
@@ -0,0 +1,12 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+from benchmarks.bench_form_init import WideForm, before
+from benchmarks.bench_memory import DictForm, measure
+
+
+def test_form_instance_memory():
+    deepcopy = measure(before, 200)
+    slots = measure(WideForm, 200)
+    # 每个实例只创建轻量的BoundField，远小于对所有字段和插件执行deepcopy
+    assert slots < deepcopy / 4
+    assert slots < measure(DictForm, 200)
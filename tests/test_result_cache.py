@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+from benchmarks.fakes import make_request
+from Tyrion import Fields
+from Tyrion import create_framework
+from Tyrion.Forms import Form
+
+calls = []
+
+
+def counting(field_class):
+    class CountingField(field_class):
+        def check(self, input_value):
+            calls.append(self.name)
+            return super(CountingField, self).check(input_value)
+    return CountingField
+
+
+class CaptchaField(counting(Fields.StringField)):
+    cacheable = False
+
+
+class OrderForm(Form):
+    RESULT_CACHE_SIZE = 8
+    RESULT_CACHE_TTL = 60
+    RESULT_CACHE_EXCLUDE = ('token',)
+    name = counting(Fields.StringField)(max_length=5)
+    tags = counting(Fields.IntegerListField)(required=False)
+    token = counting(Fields.StringField)(required=False)
+    captcha = CaptchaField(required=False)
+
+
+def validate(arguments, fail_fast=None):
+    form = OrderForm(make_request('tornado', arguments), framework=create_framework('tornado'))
+    form.is_valid(fail_fast)
+    return form
+
+
+def setup_function(function):
+    OrderForm.result_cache.clear()
+    OrderForm.result_cache.hits = OrderForm.result_cache.misses = 0
+    del calls[:]
+
+
+def test_hit_and_miss():
+    arguments = {'name': ['alex'], 'tags': ['1', '2'], 'token': ['t'], 'captcha': ['c']}
+    first = validate(arguments)
+    assert sorted(calls) == ['captcha', 'name', 'tags', 'token']
+    del calls[:]
+    second = validate(arguments)
+    # 不参与缓存的字段每次都重新验证
+    assert sorted(calls) == ['captcha', 'token']
+    assert second.value_dict == first.value_dict == {'name': 'alex', 'tags': [1, 2], 'token': 't', 'captcha': 'c'}
+    assert (OrderForm.result_cache.hits, OrderForm.result_cache.misses) == (1, 1)
+
+    del calls[:]
+    validate(dict(arguments, name=['eric']))
+    assert 'name' in calls
+    # 不参与缓存的字段的值不影响缓存键
+    del calls[:]
+    validate(dict(arguments, token=['other'], captcha=['other']))
+    assert sorted(calls) == ['captcha', 'token']
+
+
+def test_ttl_expiry():
+    now = [1000.0]
+    OrderForm.result_cache.timer = lambda: now[0]
+    try:
+        validate({'name': ['alex']})
+        now[0] += 59
+        del calls[:]
+        validate({'name': ['alex']})
+        assert 'name' not in calls
+        now[0] += 2
+        validate({'name': ['alex']})
+        assert 'name' in calls
+    finally:
+        del OrderForm.result_cache.timer
+
+
+def test_fail_fast_results_are_not_stored():
+    validate({'name': ['toolongname']}, fail_fast=True)
+    assert len(OrderForm.result_cache) == 0
+    validate({'name': ['toolongname']}, fail_fast=False)
+    assert len(OrderForm.result_cache) == 1
+    del calls[:]
+    form = validate({'name': ['toolongname']}, fail_fast=True)
+    assert 'name' not in calls
+    assert form.error_dict == {'name': 'name max length is 5'}
+
+
+def test_list_values_are_copied():
+    form = validate({'name': ['alex'], 'tags': ['1', '2']})
+    form.value_dict['tags'].append(3)
+    form.tags.value.append(4)
+    second = validate({'name': ['alex'], 'tags': ['1', '2']})
+    assert second.value_dict['tags'] == [1, 2]
+    second.tags.value.append(5)
+    assert validate({'name': ['alex'], 'tags': ['1', '2']}).tags.value == [1, 2]
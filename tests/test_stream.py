@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+import io
+
+from Tyrion import Fields
+from Tyrion import Stream
+from Tyrion.Forms import Form
+
+
+class UserForm(Form):
+    name = Fields.StringField()
+    age = Fields.IntegerField(max_value=150)
+    score = Fields.FloatField(required=False)
+    groups = Fields.IntegerListField(required=False)
+
+
+def test_iter_validate_jsonl_numbers():
+    lines = io.StringIO(u'{"name": "alex", "age": 30, "score": 9.5, "groups": [1, 2]}\n'
+                        u'{"name": "eric", "age": 200}\n')
+    results = list(UserForm.iter_validate(Stream.read_jsonl(lines)))
+    assert results[0] == (1, {'name': 'alex', 'age': 30, 'score': 9.5, 'groups': [1, 2]}, {})
+    assert results[1][0] == 2
+    assert results[1][2] == {'age': 'age max value is 150'}
+
+
+def test_iter_validate_csv():
+    lines = io.StringIO(u'name,age\nalex,30\n,x\n')
+    results = list(UserForm.iter_validate(Stream.read_csv(lines)))
+    assert results[0][1]['age'] == 30
+    assert results[1][2] == {'name': 'name is required', 'age': 'age is invalid'}
+
+
+def test_iter_validate_max_errors():
+    records = [{'name': '', 'age': 1}] * 10
+    assert len(list(UserForm.iter_validate(records, max_errors=3))) == 3
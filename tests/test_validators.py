@@ -0,0 +1,20 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+import re
+
+from Tyrion import Validators
+
+CASES = [
+    u'', u'\n', u'0', u'7', u'42', u'42\n', u'42\n\n', u'\n42', u' 42', u'42 ', u'-1', u'+1', u'1e3',
+    u'1.', u'.5', u'1.5', u'1.25', u'1.255', u'1.5\n', u'1..5', u'1.5.', u'٣', u'٣.٤', u'１',
+    u'²', u'abc', u'a\nb', u'a\n', u'0.0.0.0', u'255.255.255.255', u'256.1.1.1', u'1.1.1.256',
+    u'1..1.1', u'1.1.1.', u'.1.1.1', u'01.02.03.004', u'001.1.1.1', u'299.1.1.1', u'249.1.1.1',
+    u'1.1.1.1\n', u'1.1.1.1\n\n', u'1.1.1', u'1.1.1.1.1', u'١.1.1.1',
+]
+
+
+def test_fast_rules_match_regex():
+    for regular, rule in Validators.FAST_RULES.items():
+        pattern = re.compile(regular)
+        for value in CASES:
+            assert bool(rule(value)) == bool(pattern.match(value)), (regular, value)
@@ -0,0 +1,16 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+from Tyrion.Widget import Attributes
+
+
+def test_attributes_cache_invalidated():
+    attr = Attributes(type='text')
+    assert attr.html() == "type='text' "
+    attr['name'] = 'user'
+    assert attr.html() == "type='text' name='user' "
+    attr |= {'class': 'c1'}
+    assert isinstance(attr, Attributes)
+    assert attr.html() == "type='text' name='user' class='c1' "
+    attr.update(name='u2')
+    attr.pop('type')
+    assert attr.html() == "name='u2' class='c1' "
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+import io
+from collections import namedtuple
+
+from Tyrion.Framework import WSGI
+
+Field = namedtuple('Field', ['name', 'MULTIPLE', 'source'])
+
+
+class CountingInput(object):
+    def __init__(self, data):
+        self.stream = io.BytesIO(data)
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return self.stream.read(size)
+
+
+def make_environ(query='', body=b''):
+    return {
+        'QUERY_STRING': query,
+        'CONTENT_TYPE': 'application/x-www-form-urlencoded; charset=utf-8',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': CountingInput(body),
+    }
+
+
+def snapshot(request, *fields):
+    return WSGI().get_snapshot(request, [Field(name, multiple, source) for name, multiple, source in fields])
+
+
+def test_decoding():
+    body = b'name=alex+li&city=%E5%8C%97%E4%BA%AC&sign=1%2B1%3D2&empty=&flag'
+    result = WSGI().parse(body, {'name': None, 'city': None, 'sign': None, 'empty': None, 'flag': None})
+    assert result == {'name': ['alex li'], 'city': [u'北京'], 'sign': ['1+1=2'], 'empty': [''], 'flag': ['']}
+
+
+def test_percent_encoded_keys_and_repeated_keys():
+    body = b'user%5Fname=alex&hobby=1&hob%62y=2&hobby=3&first+name=a&other=x'
+    result = WSGI().parse(body, {'user_name': None, 'hobby': None, 'first name': None})
+    assert result == {'user_name': ['alex'], 'hobby': ['1', '2', '3'], 'first name': ['a']}
+    assert WSGI().get_argument(body, 'hobby') == '3'
+    assert WSGI().get_arguments(body, 'hobby') == ['1', '2', '3']
+    assert WSGI().get_argument(body, 'missing', 'd') == 'd'
+
+
+def test_source_filtering():
+    environ = make_environ('page=2&name=query', b'page=3&name=body')
+    result = snapshot(environ, ('page', False, 'query'), ('name', False, 'body'))
+    assert result.get('page') == '2'
+    assert result.get('name') == 'body'
+
+    environ = make_environ('tag=a', b'tag=b')
+    assert snapshot(environ, ('tag', True, None)).getlist('tag') == ['a', 'b']
+
+
+def test_latin1_query_string():
+    # PEP 3333：environ中的QUERY_STRING是按latin-1解码的原始字节
+    raw = u'城市'.encode('utf-8')
+    environ = make_environ('city=%s&raw=%s' % (raw.decode('latin-1'), '%E5%9F%8E'))
+    result = snapshot(environ, ('city', False, None), ('raw', False, None))
+    assert result.get('city') == u'城市'
+    assert result.get('raw') == u'城'
+
+
+def test_body_is_read_once():
+    environ = make_environ(body=b'name=alex&age=3')
+    stream = environ['wsgi.input']
+    assert snapshot(environ, ('name', False, None)).get('name') == 'alex'
+    assert WSGI().get_argument(environ, 'age') == '3'
+    assert WSGI().get_argument(environ, 'name') == 'alex'
+    assert stream.reads == 1